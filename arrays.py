@@ -0,0 +1,83 @@
+#! python3
+# -*- mode: Python; python-indent-offset: 2; coding: utf-8 -*-
+
+# routines shared by the other modules: optional support for numpy, and
+# 64-bit digests of values
+
+from __future__ import print_function
+
+import hashlib
+import struct
+
+from enigma import enigma
+
+__author__ = "Jim Randell <jim.randell@gmail.com>"
+__version__ = "2026-10-17"
+
+arrays = enigma.module(__name__)
+
+# a 64-bit digest of value <x> (using its repr()), as an integer
+#
+# blake2b is used if it is available, otherwise the first 8 bytes of
+# sha1 are used, so digests made by different versions of Python should
+# not be mixed
+def digest(x):
+  return _unpack(_hash(repr(x).encode()))[0]
+
+if hasattr(hashlib, 'blake2b'):
+  _hash = (lambda b: hashlib.blake2b(b, digest_size=8).digest())
+else:
+  # [Python 2]
+  _hash = (lambda b: hashlib.sha1(b).digest()[:8])
+
+_unpack = struct.Struct('<Q').unpack
+
+# return numpy, or None if it is not available
+def numpy():
+  global _np
+  if _np is None:
+    try:
+      import numpy
+      _np = numpy
+    except ImportError:
+      _np = False
+  return (_np or None)
+
+_np = None
+
+# canonical forms of shapes using numpy (see: polyominoes.canonical_forms())
+#
+# the shapes <ss> (sequences of (x, y) cells) are grouped by size, and
+# each group is passed to <fn> (with <np>) as an array of shape
+# (<shapes>, <cells>, 2). <fn> returns (<ks>, <m>), where <ks> is a list
+# with an array for each orientation, holding the sorted cells of each
+# shape as x * m + y.
+#
+# for each shape the smallest orientation allowed by <flags> is chosen,
+# and (<cells>, <orientation flags>) is returned (the flags have bit <k>
+# set for each orientation <k> that gives the same cells)
+def canonical_forms(np, ss, flags, fn):
+  rs = [None] * len(ss)
+  # group the shapes by size
+  d = dict()
+  for (j, s) in enumerate(ss):
+    d.setdefault(len(s), list()).append(j)
+  for (n, js) in d.items():
+    a = np.array(list(ss[j] for j in js), dtype=np.int64).reshape(len(js), n, 2)
+    (ks, m) = fn(np, a)
+    # choose the smallest allowed orientation
+    z = None
+    for (k, c) in enumerate(ks):
+      if not (flags >> k) & 1: continue
+      if z is None:
+        z = c.copy()
+        continue
+      e = (c != z)
+      i = e.argmax(1)
+      r = np.arange(len(js))
+      lt = e.any(1) & (c[r, i] < z[r, i])
+      z[lt] = c[lt]
+    f = sum((c == z).all(1).astype(np.int64) << k for (k, c) in enumerate(ks))
+    for (j, vs, g) in zip(js, z.tolist(), f.tolist()):
+      rs[j] = (tuple(divmod(v, m) for v in vs), g)
+  return rs
@@ -0,0 +1,318 @@
+#! python3
+# -*- mode: Python; python-indent-offset: 2; coding: utf-8 -*-
+
+# an implementation of Knuth's "Dancing Links" (DLX) for algorithm X
+#
+# the links of the sparse matrix are held in flat lists of integers
+# (which are faster to index than array.array() in CPython), and the
+# column with the fewest remaining rows is chosen at each step (the MRV
+# heuristic). no sets are allocated during the search.
+#
+# algorithmX() and exact_cover() can be used in place of the
+# corresponding functions in enigma.py (although solutions may be
+# generated in a different order).
+
+from __future__ import print_function
+
+from enigma import (enigma, printf)
+
+__author__ = "Jim Randell <jim.randell@gmail.com>"
+__version__ = "2026-10-17"
+
+dlx = enigma.module(__name__)
+
+# a DLX matrix with <n> columns (numbered 0 .. n - 1)
+# rows <rs> are given as sequences of column numbers
+#
+# <mult> maps column numbers to the number of times the column must be
+# covered (default = 1). a column with a multiplicity greater than 1 is
+# not chosen to branch on until it only needs to be covered once more,
+# or until it is one of the only columns remaining. in the latter case
+# the rows that cover it are tried in order, and each row is hidden once
+# it has been tried, so the rows are chosen as a set (rather than in
+# every possible order).
+#
+# node 0 is the root, nodes 1 .. n are the column headers, and the
+# remaining nodes are the 1s in the matrix (in row order)
+class DLX(object):
+
+  def __init__(self, n, rs, mult=None):
+    rs = list(rs)
+    N = 1 + n + sum(len(r) for r in rs)
+    # left/right/up/down links, column of each node, row of each node
+    self.L = L = list(range(-1, N - 1))
+    self.R = R = list(range(1, N + 1))
+    self.U = U = list(range(N))
+    self.D = D = list(range(N))
+    self.C = C = list(range(N))
+    self.W = W = [-1] * N
+    # number of rows in each column (covered columns, and the root, are
+    # offset by <big>, so the column to choose can be found with min())
+    self.big = big = N + 1
+    self.S = S = [0] * (n + 1)
+    S[0] = big
+    # link the headers into a circular list
+    L[0] = n
+    R[n] = 0
+    # add in the rows
+    k = n + 1
+    for (i, r) in enumerate(rs):
+      if not r: continue
+      k0 = k
+      for c in r:
+        c += 1
+        # add node k to the bottom of column c
+        C[k] = c
+        W[k] = i
+        U[k] = U[c]
+        D[k] = c
+        D[U[c]] = k
+        U[c] = k
+        S[c] += 1
+        k += 1
+      # make the row circular
+      L[k0] = k - 1
+      R[k - 1] = k0
+    # the remaining multiplicity of each column (columns that must be
+    # covered more than once are also offset by <big>)
+    self.M = M = [1] * (n + 1)
+    self.ms = list()
+    if mult:
+      for (c, m) in mult.items():
+        if m > 1:
+          M[c + 1] = m
+          S[c + 1] += big
+          self.ms.append(c + 1)
+    self.n = n
+    self.rows = rs
+
+  # the row indices of the nodes in <os>
+  def rows_of(self, os):
+    W = self.W
+    return list(W[o] for o in os)
+
+  # generate exact covers, as lists of row indices
+  # (see search() for <prune>)
+  def solve(self, prune=None):
+    for os in self.search(prune):
+      yield self.rows_of(os)
+
+  # count exact covers (stopping after <limit> covers, if specified)
+  # (no solutions are constructed)
+  def count(self, limit=None, prune=None):
+    n = 0
+    if limit is None or limit > 0:
+      for _ in self.search(prune):
+        n += 1
+        if n == limit: break
+    return n
+
+  # the search: the (shared) list of nodes of the chosen rows is
+  # generated for each exact cover. if the search is abandoned early the
+  # matrix is not restored.
+  #
+  # if <prune> is specified it is called with the list of nodes of the
+  # chosen rows at each step of the search, and if it returns a true
+  # value the partial solution is abandoned.
+  def search(self, prune=None):
+    (L, R, U, D, C, S, M, ms, big) = (self.L, self.R, self.U, self.D, self.C, self.S, self.M, self.ms, self.big)
+    # the nodes of the rows chosen at each level
+    os = list()
+    # the rows hidden at each level that branches on a column that must
+    # be covered more than once
+    hs = list()
+    while True:
+      # choose the column with the fewest rows
+      s = (0 if prune is not None and prune(os) else min(S))
+      if s >= big:
+        # all columns are covered (unless more are required)
+        c = next((c for c in ms if M[c] > 1), 0)
+        if c == 0:
+          yield os
+          r = 0
+        elif S[c] - big < M[c]:
+          # not enough rows remain to cover the column
+          r = 0
+        else:
+          # branch on a column that must be covered more than once
+          hs.append(list())
+          r = D[c]
+      elif s == 0:
+        # an uncoverable column
+        r = 0
+      else:
+        # try the first row in the column
+        r = D[S.index(s)]
+      if r == 0:
+        # backtrack to the next row to try
+        while True:
+          if not os: return
+          r = os.pop()
+          # deselect row r (uncover the columns of row r, from the left)
+          h = 1
+          i = L[r]
+          while True:
+            c = C[i]
+            if M[c] > 1 or S[c] < big:
+              # restore the multiplicity of the column
+              if M[c] == 1: S[c] += big
+              M[c] += 1
+              if i == r: break
+              i = L[i]
+              continue
+            h = 0
+            x = U[c]
+            while x != c:
+              j = L[x]
+              while j != x:
+                S[C[j]] += 1
+                D[U[j]] = j
+                U[D[j]] = j
+                j = L[j]
+              x = U[x]
+            S[c] -= big
+            R[L[c]] = c
+            L[R[c]] = c
+            if i == r: break
+            i = L[i]
+          # if no columns were covered the row was hidden, so restore it
+          if h: _unhide(r, L, U, D, C, S)
+          c = C[r]
+          if M[c] > 1:
+            # hide the row just tried, and try the next row (if enough remain)
+            _hide(r, R, U, D, C, S)
+            hs[-1].append(r)
+            if S[c] - big >= M[c]:
+              r = D[c]
+              break
+            # otherwise restore the hidden rows, and backtrack further
+            for r in reversed(hs.pop()): _unhide(r, L, U, D, C, S)
+            continue
+          r = D[r]
+          if r != c: break
+      # select row r (cover the columns of row r, from the right)
+      os.append(r)
+      h = 1
+      i = r
+      while True:
+        c = C[i]
+        if M[c] > 1:
+          # reduce the multiplicity of the column
+          M[c] -= 1
+          if M[c] == 1: S[c] -= big
+          i = R[i]
+          if i == r: break
+          continue
+        h = 0
+        R[L[c]] = R[c]
+        L[R[c]] = L[c]
+        S[c] += big
+        x = D[c]
+        while x != c:
+          j = R[x]
+          while j != x:
+            D[U[j]] = D[j]
+            U[D[j]] = U[j]
+            S[C[j]] -= 1
+            j = R[j]
+          x = D[x]
+        i = R[i]
+        if i == r: break
+      # if no columns were covered the row is still linked in, so hide it
+      if h: _hide(r, R, U, D, C, S)
+
+# remove the nodes of row (node) <r> from their columns
+def _hide(r, R, U, D, C, S):
+  j = r
+  while True:
+    D[U[j]] = D[j]
+    U[D[j]] = U[j]
+    S[C[j]] -= 1
+    j = R[j]
+    if j == r: break
+
+# restore the nodes of row (node) <r> (reversing _hide())
+def _unhide(r, L, U, D, C, S):
+  j = L[r]
+  while True:
+    S[C[j]] += 1
+    D[U[j]] = j
+    U[D[j]] = j
+    if j == r: break
+    j = L[j]
+
+# algorithm X (compatible with enigma.algorithmX())
+#
+# X = map of column -> rows
+# Y = map (or list) of row -> columns
+#
+# if <prune> is specified it is called with the list of the rows chosen
+# so far at each step of the search, and if it returns a true value the
+# partial solution is abandoned.
+#
+# <mult> maps columns to the number of times they must be covered
+# (default = 1)
+def algorithmX(X, Y, soln=None, prune=None, mult=None):
+  if soln is None: soln = list()
+  (m, ks) = _matrix(X, Y, mult)
+  for rs in m.solve(_prune(m, ks, prune)):
+    yield soln + list(ks[r] for r in rs)
+
+# count the exact covers found by algorithmX()
+# (stopping after <limit> covers, if specified)
+def algorithmX_count(X, Y, limit=None, prune=None, mult=None):
+  (m, ks) = _matrix(X, Y, mult)
+  return m.count(limit, _prune(m, ks, prune))
+
+# make a DLX matrix from <X>, <Y> (with column multiplicities <mult>)
+# return (<matrix>, <row keys>)
+def _matrix(X, Y, mult=None):
+  cs = dict((c, i) for (i, c) in enumerate(X.keys()))
+  ks = list(range(len(Y)) if isinstance(Y, list) else Y.keys())
+  if mult: mult = dict((cs[c], m) for (c, m) in mult.items())
+  return (DLX(len(cs), (list(cs[c] for c in Y[k]) for k in ks), mult), ks)
+
+# make a prune function for the nodes of matrix <m>, from a prune
+# function <prune> for the row keys <ks>
+def _prune(m, ks, prune):
+  if prune is None: return None
+  rows_of = m.rows_of
+  return (lambda os: prune(list(ks[r] for r in rows_of(os))))
+
+# exact cover (compatible with enigma.exact_cover())
+#
+# choose one set from each of the sequences of sets in <sss>, such
+# that the chosen sets form an exact cover of <tgt> (or of their union)
+def exact_cover(sss, tgt=None):
+  # columns are the sequence indices, followed by the elements
+  n = len(sss)
+  cs = dict()
+  if tgt is not None:
+    for x in tgt: cs.setdefault(x, n + len(cs))
+  (rs, ss) = (list(), list())
+  for (i, xs) in enumerate(sss):
+    for s in xs:
+      r = [i]
+      for x in s:
+        r.append(cs.setdefault(x, n + len(cs)))
+      rs.append(r)
+      ss.append((i, s))
+  m = DLX(n + len(cs), rs)
+  for js in m.solve():
+    v = [None] * n
+    for j in js:
+      (i, s) = ss[j]
+      v[i] = s
+    yield tuple(v)
+
+
+if enigma._namecheck(__name__):
+
+  # a small example (Knuth's example matrix)
+  rs = [[2, 4, 5], [0, 3, 6], [1, 2, 5], [0, 3], [1, 6], [3, 4, 6]]
+  for s in DLX(7, rs).solve():
+    printf("{s}", s=sorted(s))
+
+  # a column that must be covered twice
+  for s in DLX(1, [[0], [0]], mult={0: 2}).solve():
+    printf("{s}", s=sorted(s))
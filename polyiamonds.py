@@ -5,10 +5,14 @@
 
 from __future__ import print_function
 
+from collections import OrderedDict
 from enigma import (
   enigma, basestring, exact_cover, irange, unpack, peek, join, printf
 )
 
+import arrays
+import dlx
+
 __author__ = "Jim Randell <jim.randell@gmail.com>"
 __version__ = "2025-07-01"
 
@@ -35,7 +39,289 @@ __version__ = "2025-07-01"
 (M0, M1, M2, M3, M4, M5) = (64, 128, 256, 512, 1024, 2048)
 
 # precalculated polyiamonds (can also be generated from prototypes)
-polyiamonds_data = dict()
+#
+# this table holds the orientations of each of the shapes in <protos>
+# (entries are generated with: python3 polyiamonds.py <name>)
+polyiamonds_data = {
+  "T1": [
+    (((0, 0),), R0 | R2 | R4 | M1 | M3 | M5),
+    (((0, 1),), R1 | R3 | R5 | M0 | M2 | M4),
+  ],
+  "D2": [
+    (((0, 0), (0, 1)), R0 | R3 | M1 | M4),
+    (((0, 1), (0, 2)), R1 | R4 | M2 | M5),
+    (((0, 1), (1, 0)), R2 | R5 | M0 | M3),
+  ],
+  "I3": [
+    (((0, 0), (0, 1), (1, 0)), R0 | M3),
+    (((0, 1), (0, 2), (0, 3)), R1 | M4),
+    (((0, 1), (0, 2), (1, 0)), R2 | M5),
+    (((0, 1), (1, 0), (1, 1)), R3 | M0),
+    (((0, 0), (0, 1), (0, 2)), R4 | M1),
+    (((0, 3), (1, 1), (1, 2)), R5 | M2),
+  ],
+  "T4": [
+    (((0, 0), (0, 1), (0, 2), (1, 0)), R0 | R2 | R4 | M1 | M3 | M5),
+    (((0, 3), (1, 1), (1, 2), (1, 3)), R1 | R3 | R5 | M0 | M2 | M4),
+  ],
+  "I4": [
+    (((0, 0), (0, 1), (1, 0), (1, 1)), R0 | R3),
+    (((0, 1), (0, 2), (0, 3), (0, 4)), R1 | R4),
+    (((0, 3), (1, 1), (1, 2), (2, 0)), R2 | R5),
+    (((0, 1), (1, 0), (1, 1), (2, 0)), M0 | M3),
+    (((0, 0), (0, 1), (0, 2), (0, 3)), M1 | M4),
+    (((0, 3), (0, 4), (1, 1), (1, 2)), M2 | M5),
+  ],
+  "I4'": [
+    (((0, 1), (1, 0), (1, 1), (2, 0)), R0 | R3),
+    (((0, 0), (0, 1), (0, 2), (0, 3)), R1 | R4),
+    (((0, 3), (0, 4), (1, 1), (1, 2)), R2 | R5),
+    (((0, 0), (0, 1), (1, 0), (1, 1)), M0 | M3),
+    (((0, 1), (0, 2), (0, 3), (0, 4)), M1 | M4),
+    (((0, 3), (1, 1), (1, 2), (2, 0)), M2 | M5),
+  ],
+  "I5": [
+    (((0, 0), (0, 1), (1, 0), (1, 1), (2, 0)), R0 | M3),
+    (((0, 1), (0, 2), (0, 3), (0, 4), (0, 5)), R1 | M4),
+    (((0, 3), (0, 4), (1, 1), (1, 2), (2, 0)), R2 | M5),
+    (((0, 1), (1, 0), (1, 1), (2, 0), (2, 1)), R3 | M0),
+    (((0, 0), (0, 1), (0, 2), (0, 3), (0, 4)), R4 | M1),
+    (((0, 5), (1, 3), (1, 4), (2, 1), (2, 2)), R5 | M2),
+  ],
+  "O6": [
+    (((0, 1), (0, 2), (0, 3), (1, 0), (1, 1), (1, 2)), R0 | R1 | R2 | R3 | R4 | R5 | M0 | M1 | M2 | M3 | M4 | M5),
+  ],
+  "I6": [
+    (((0, 0), (0, 1), (1, 0), (1, 1), (2, 0), (2, 1)), R0 | R3),
+    (((0, 1), (0, 2), (0, 3), (0, 4), (0, 5), (0, 6)), R1 | R4),
+    (((0, 5), (1, 3), (1, 4), (2, 1), (2, 2), (3, 0)), R2 | R5),
+    (((0, 1), (1, 0), (1, 1), (2, 0), (2, 1), (3, 0)), M0 | M3),
+    (((0, 0), (0, 1), (0, 2), (0, 3), (0, 4), (0, 5)), M1 | M4),
+    (((0, 5), (0, 6), (1, 3), (1, 4), (2, 1), (2, 2)), M2 | M5),
+  ],
+  "I6'": [
+    (((0, 1), (1, 0), (1, 1), (2, 0), (2, 1), (3, 0)), R0 | R3),
+    (((0, 0), (0, 1), (0, 2), (0, 3), (0, 4), (0, 5)), R1 | R4),
+    (((0, 5), (0, 6), (1, 3), (1, 4), (2, 1), (2, 2)), R2 | R5),
+    (((0, 0), (0, 1), (1, 0), (1, 1), (2, 0), (2, 1)), M0 | M3),
+    (((0, 1), (0, 2), (0, 3), (0, 4), (0, 5), (0, 6)), M1 | M4),
+    (((0, 5), (1, 3), (1, 4), (2, 1), (2, 2), (3, 0)), M2 | M5),
+  ],
+  "C6": [
+    (((0, 0), (0, 1), (0, 2), (0, 3), (1, 2), (1, 3)), R0 | M4),
+    (((0, 3), (0, 4), (0, 5), (0, 6), (1, 1), (1, 2)), R1 | M5),
+    (((0, 3), (1, 1), (1, 2), (2, 0), (2, 1), (3, 0)), R2 | M0),
+    (((0, 0), (0, 1), (1, 0), (1, 1), (1, 2), (1, 3)), R3 | M1),
+    (((0, 5), (0, 6), (1, 1), (1, 2), (1, 3), (1, 4)), R4 | M2),
+    (((0, 3), (1, 2), (1, 3), (2, 1), (2, 2), (3, 0)), R5 | M3),
+  ],
+  "E6": [
+    (((0, 1), (1, 0), (1, 1), (1, 2), (2, 0), (2, 1)), R0 | M3),
+    (((0, 3), (1, 0), (1, 1), (1, 2), (1, 3), (1, 4)), R1 | M4),
+    (((0, 5), (1, 2), (1, 3), (1, 4), (2, 1), (2, 2)), R2 | M5),
+    (((0, 2), (0, 3), (1, 1), (1, 2), (1, 3), (2, 2)), R3 | M0),
+    (((0, 1), (0, 2), (0, 3), (0, 4), (0, 5), (1, 2)), R4 | M1),
+    (((0, 3), (0, 4), (1, 1), (1, 2), (1, 3), (2, 0)), R5 | M2),
+  ],
+  "F6": [
+    (((0, 0), (0, 1), (0, 2), (1, 0), (1, 1), (1, 2)), R0),
+    (((0, 3), (0, 5), (1, 1), (1, 2), (1, 3), (1, 4)), R1),
+    (((0, 2), (0, 3), (1, 0), (1, 1), (1, 2), (2, 0)), R2),
+    (((0, 1), (0, 2), (0, 3), (1, 1), (1, 2), (1, 3)), R3),
+    (((0, 1), (0, 2), (0, 3), (0, 4), (1, 0), (1, 2)), R4),
+    (((0, 3), (1, 1), (1, 2), (1, 3), (2, 0), (2, 1)), R5),
+    (((0, 3), (1, 1), (1, 2), (1, 3), (2, 1), (2, 2)), M0),
+    (((0, 0), (0, 1), (0, 2), (0, 3), (1, 0), (1, 2)), M1),
+    (((0, 3), (0, 4), (0, 5), (1, 1), (1, 2), (1, 3)), M2),
+    (((0, 1), (0, 2), (1, 0), (1, 1), (1, 2), (2, 0)), M3),
+    (((0, 1), (0, 3), (1, 0), (1, 1), (1, 2), (1, 3)), M4),
+    (((0, 2), (0, 3), (0, 4), (1, 0), (1, 1), (1, 2)), M5),
+  ],
+  "F6'": [
+    (((0, 0), (0, 1), (0, 2), (0, 3), (1, 0), (1, 2)), R0),
+    (((0, 3), (0, 4), (0, 5), (1, 1), (1, 2), (1, 3)), R1),
+    (((0, 1), (0, 2), (1, 0), (1, 1), (1, 2), (2, 0)), R2),
+    (((0, 1), (0, 3), (1, 0), (1, 1), (1, 2), (1, 3)), R3),
+    (((0, 2), (0, 3), (0, 4), (1, 0), (1, 1), (1, 2)), R4),
+    (((0, 3), (1, 1), (1, 2), (1, 3), (2, 1), (2, 2)), R5),
+    (((0, 3), (1, 1), (1, 2), (1, 3), (2, 0), (2, 1)), M0),
+    (((0, 0), (0, 1), (0, 2), (1, 0), (1, 1), (1, 2)), M1),
+    (((0, 3), (0, 5), (1, 1), (1, 2), (1, 3), (1, 4)), M2),
+    (((0, 2), (0, 3), (1, 0), (1, 1), (1, 2), (2, 0)), M3),
+    (((0, 1), (0, 2), (0, 3), (1, 1), (1, 2), (1, 3)), M4),
+    (((0, 1), (0, 2), (0, 3), (0, 4), (1, 0), (1, 2)), M5),
+  ],
+  "G6": [
+    (((0, 1), (0, 2), (0, 3), (0, 4), (1, 0), (1, 1)), R0),
+    (((0, 3), (1, 1), (1, 2), (2, 0), (2, 1), (2, 2)), R1),
+    (((0, 0), (0, 1), (0, 3), (1, 0), (1, 1), (1, 2)), R2),
+    (((0, 4), (0, 5), (1, 1), (1, 2), (1, 3), (1, 4)), R3),
+    (((0, 1), (0, 2), (0, 3), (1, 1), (1, 2), (2, 0)), R4),
+    (((0, 1), (0, 2), (0, 3), (1, 0), (1, 2), (1, 3)), R5),
+    (((0, 3), (0, 4), (0, 5), (1, 1), (1, 2), (1, 4)), M0),
+    (((0, 1), (0, 2), (0, 3), (1, 0), (1, 1), (2, 0)), M1),
+    (((0, 1), (0, 2), (1, 0), (1, 1), (1, 2), (1, 3)), M2),
+    (((0, 1), (0, 3), (0, 4), (1, 0), (1, 1), (1, 2)), M3),
+    (((0, 3), (1, 2), (1, 3), (2, 0), (2, 1), (2, 2)), M4),
+    (((0, 0), (0, 1), (0, 2), (0, 3), (1, 1), (1, 2)), M5),
+  ],
+  "G6'": [
+    (((0, 0), (0, 1), (0, 2), (0, 3), (1, 1), (1, 2)), R0),
+    (((0, 3), (0, 4), (0, 5), (1, 1), (1, 2), (1, 4)), R1),
+    (((0, 1), (0, 2), (0, 3), (1, 0), (1, 1), (2, 0)), R2),
+    (((0, 1), (0, 2), (1, 0), (1, 1), (1, 2), (1, 3)), R3),
+    (((0, 1), (0, 3), (0, 4), (1, 0), (1, 1), (1, 2)), R4),
+    (((0, 3), (1, 2), (1, 3), (2, 0), (2, 1), (2, 2)), R5),
+    (((0, 3), (1, 1), (1, 2), (2, 0), (2, 1), (2, 2)), M0),
+    (((0, 0), (0, 1), (0, 3), (1, 0), (1, 1), (1, 2)), M1),
+    (((0, 4), (0, 5), (1, 1), (1, 2), (1, 3), (1, 4)), M2),
+    (((0, 1), (0, 2), (0, 3), (1, 1), (1, 2), (2, 0)), M3),
+    (((0, 1), (0, 2), (0, 3), (1, 0), (1, 2), (1, 3)), M4),
+    (((0, 1), (0, 2), (0, 3), (0, 4), (1, 0), (1, 1)), M5),
+  ],
+  "H6": [
+    (((0, 1), (1, 0), (1, 1), (1, 2), (1, 3), (2, 0)), R0),
+    (((0, 3), (0, 4), (1, 0), (1, 1), (1, 2), (1, 3)), R1),
+    (((0, 3), (1, 2), (1, 3), (1, 4), (2, 1), (2, 2)), R2),
+    (((0, 3), (1, 0), (1, 1), (1, 2), (1, 3), (2, 2)), R3),
+    (((0, 2), (0, 3), (0, 4), (0, 5), (1, 1), (1, 2)), R4),
+    (((0, 3), (0, 4), (1, 1), (1, 2), (1, 3), (2, 2)), R5),
+    (((0, 2), (0, 3), (1, 1), (1, 2), (1, 3), (2, 0)), M0),
+    (((0, 1), (0, 2), (0, 3), (0, 4), (1, 2), (1, 3)), M1),
+    (((0, 3), (1, 1), (1, 2), (1, 3), (1, 4), (2, 0)), M2),
+    (((0, 3), (1, 0), (1, 1), (1, 2), (2, 0), (2, 1)), M3),
+    (((0, 2), (0, 3), (1, 1), (1, 2), (1, 3), (1, 4)), M4),
+    (((0, 5), (1, 1), (1, 2), (1, 3), (1, 4), (2, 2)), M5),
+  ],
+  "H6'": [
+    (((0, 1), (0, 2), (0, 3), (0, 4), (1, 2), (1, 3)), R0),
+    (((0, 3), (1, 1), (1, 2), (1, 3), (1, 4), (2, 0)), R1),
+    (((0, 3), (1, 0), (1, 1), (1, 2), (2, 0), (2, 1)), R2),
+    (((0, 2), (0, 3), (1, 1), (1, 2), (1, 3), (1, 4)), R3),
+    (((0, 5), (1, 1), (1, 2), (1, 3), (1, 4), (2, 2)), R4),
+    (((0, 2), (0, 3), (1, 1), (1, 2), (1, 3), (2, 0)), R5),
+    (((0, 3), (0, 4), (1, 1), (1, 2), (1, 3), (2, 2)), M0),
+    (((0, 1), (1, 0), (1, 1), (1, 2), (1, 3), (2, 0)), M1),
+    (((0, 3), (0, 4), (1, 0), (1, 1), (1, 2), (1, 3)), M2),
+    (((0, 3), (1, 2), (1, 3), (1, 4), (2, 1), (2, 2)), M3),
+    (((0, 3), (1, 0), (1, 1), (1, 2), (1, 3), (2, 2)), M4),
+    (((0, 2), (0, 3), (0, 4), (0, 5), (1, 1), (1, 2)), M5),
+  ],
+  "J6": [
+    (((0, 1), (1, 0), (1, 1), (2, 0), (2, 1), (2, 2)), R0),
+    (((0, 5), (1, 0), (1, 1), (1, 2), (1, 3), (1, 4)), R1),
+    (((0, 4), (0, 5), (1, 3), (1, 4), (2, 1), (2, 2)), R2),
+    (((0, 1), (0, 2), (0, 3), (1, 2), (1, 3), (2, 2)), R3),
+    (((0, 1), (0, 2), (0, 3), (0, 4), (0, 5), (1, 0)), R4),
+    (((0, 3), (0, 4), (1, 1), (1, 2), (2, 0), (2, 1)), R5),
+    (((0, 2), (0, 3), (1, 2), (1, 3), (2, 1), (2, 2)), M0),
+    (((0, 1), (0, 2), (0, 3), (0, 4), (0, 5), (1, 4)), M1),
+    (((0, 3), (0, 4), (0, 5), (1, 1), (1, 2), (2, 0)), M2),
+    (((0, 1), (0, 2), (1, 0), (1, 1), (2, 0), (2, 1)), M3),
+    (((0, 1), (1, 0), (1, 1), (1, 2), (1, 3), (1, 4)), M4),
+    (((0, 5), (1, 3), (1, 4), (2, 0), (2, 1), (2, 2)), M5),
+  ],
+  "J6'": [
+    (((0, 1), (0, 2), (1, 0), (1, 1), (2, 0), (2, 1)), R0),
+    (((0, 1), (1, 0), (1, 1), (1, 2), (1, 3), (1, 4)), R1),
+    (((0, 5), (1, 3), (1, 4), (2, 0), (2, 1), (2, 2)), R2),
+    (((0, 2), (0, 3), (1, 2), (1, 3), (2, 1), (2, 2)), R3),
+    (((0, 1), (0, 2), (0, 3), (0, 4), (0, 5), (1, 4)), R4),
+    (((0, 3), (0, 4), (0, 5), (1, 1), (1, 2), (2, 0)), R5),
+    (((0, 1), (0, 2), (0, 3), (1, 2), (1, 3), (2, 2)), M0),
+    (((0, 1), (0, 2), (0, 3), (0, 4), (0, 5), (1, 0)), M1),
+    (((0, 3), (0, 4), (1, 1), (1, 2), (2, 0), (2, 1)), M2),
+    (((0, 1), (1, 0), (1, 1), (2, 0), (2, 1), (2, 2)), M3),
+    (((0, 5), (1, 0), (1, 1), (1, 2), (1, 3), (1, 4)), M4),
+    (((0, 4), (0, 5), (1, 3), (1, 4), (2, 1), (2, 2)), M5),
+  ],
+  "P6": [
+    (((0, 0), (0, 1), (0, 2), (1, 0), (1, 1), (2, 0)), R0),
+    (((0, 3), (1, 1), (1, 2), (1, 3), (1, 4), (1, 5)), R1),
+    (((0, 3), (0, 4), (1, 0), (1, 1), (1, 2), (2, 0)), R2),
+    (((0, 3), (1, 2), (1, 3), (2, 1), (2, 2), (2, 3)), R3),
+    (((0, 0), (0, 1), (0, 2), (0, 3), (0, 4), (1, 2)), R4),
+    (((0, 5), (1, 3), (1, 4), (1, 5), (2, 1), (2, 2)), R5),
+    (((0, 3), (1, 1), (1, 2), (1, 3), (2, 2), (2, 3)), M0),
+    (((0, 0), (0, 1), (0, 2), (0, 3), (0, 4), (1, 0)), M1),
+    (((0, 5), (1, 3), (1, 4), (2, 1), (2, 2), (2, 3)), M2),
+    (((0, 0), (0, 1), (1, 0), (1, 1), (1, 2), (2, 0)), M3),
+    (((0, 5), (1, 1), (1, 2), (1, 3), (1, 4), (1, 5)), M4),
+    (((0, 2), (0, 3), (0, 4), (1, 1), (1, 2), (2, 0)), M5),
+  ],
+  "P6'": [
+    (((0, 0), (0, 1), (1, 0), (1, 1), (1, 2), (2, 0)), R0),
+    (((0, 5), (1, 1), (1, 2), (1, 3), (1, 4), (1, 5)), R1),
+    (((0, 2), (0, 3), (0, 4), (1, 1), (1, 2), (2, 0)), R2),
+    (((0, 3), (1, 1), (1, 2), (1, 3), (2, 2), (2, 3)), R3),
+    (((0, 0), (0, 1), (0, 2), (0, 3), (0, 4), (1, 0)), R4),
+    (((0, 5), (1, 3), (1, 4), (2, 1), (2, 2), (2, 3)), R5),
+    (((0, 3), (1, 2), (1, 3), (2, 1), (2, 2), (2, 3)), M0),
+    (((0, 0), (0, 1), (0, 2), (0, 3), (0, 4), (1, 2)), M1),
+    (((0, 5), (1, 3), (1, 4), (1, 5), (2, 1), (2, 2)), M2),
+    (((0, 0), (0, 1), (0, 2), (1, 0), (1, 1), (2, 0)), M3),
+    (((0, 3), (1, 1), (1, 2), (1, 3), (1, 4), (1, 5)), M4),
+    (((0, 3), (0, 4), (1, 0), (1, 1), (1, 2), (2, 0)), M5),
+  ],
+  "S6": [
+    (((0, 1), (1, 0), (1, 1), (1, 2), (1, 3), (2, 2)), R0 | R3),
+    (((0, 3), (0, 4), (0, 5), (1, 0), (1, 1), (1, 2)), R1 | R4),
+    (((0, 3), (0, 4), (1, 2), (1, 3), (2, 1), (2, 2)), R2 | R5),
+    (((0, 2), (0, 3), (1, 1), (1, 2), (2, 0), (2, 1)), M0 | M3),
+    (((0, 1), (0, 2), (0, 3), (1, 2), (1, 3), (1, 4)), M1 | M4),
+    (((0, 5), (1, 1), (1, 2), (1, 3), (1, 4), (2, 0)), M2 | M5),
+  ],
+  "S6'": [
+    (((0, 2), (0, 3), (1, 1), (1, 2), (2, 0), (2, 1)), R0 | R3),
+    (((0, 1), (0, 2), (0, 3), (1, 2), (1, 3), (1, 4)), R1 | R4),
+    (((0, 5), (1, 1), (1, 2), (1, 3), (1, 4), (2, 0)), R2 | R5),
+    (((0, 1), (1, 0), (1, 1), (1, 2), (1, 3), (2, 2)), M0 | M3),
+    (((0, 3), (0, 4), (0, 5), (1, 0), (1, 1), (1, 2)), M1 | M4),
+    (((0, 3), (0, 4), (1, 2), (1, 3), (2, 1), (2, 2)), M2 | M5),
+  ],
+  "V6": [
+    (((0, 0), (0, 1), (0, 2), (0, 3), (1, 0), (1, 1)), R0 | M1),
+    (((0, 3), (0, 4), (1, 1), (1, 2), (1, 3), (1, 4)), R1 | M2),
+    (((0, 1), (0, 3), (1, 0), (1, 1), (1, 2), (2, 0)), R2 | M3),
+    (((0, 2), (0, 3), (1, 0), (1, 1), (1, 2), (1, 3)), R3 | M4),
+    (((0, 1), (0, 2), (0, 3), (0, 4), (1, 1), (1, 2)), R4 | M5),
+    (((0, 3), (1, 1), (1, 2), (1, 3), (2, 0), (2, 2)), R5 | M0),
+  ],
+  "X6": [
+    (((0, 3), (1, 0), (1, 1), (1, 2), (1, 3), (2, 0)), R0 | R3 | M0 | M3),
+    (((0, 2), (0, 3), (0, 4), (1, 1), (1, 2), (1, 3)), R1 | R4 | M1 | M4),
+    (((0, 3), (1, 1), (1, 2), (1, 3), (1, 4), (2, 2)), R2 | R5 | M2 | M5),
+  ],
+  "D7": [
+    (((0, 0), (0, 1), (0, 2), (0, 3), (1, 0), (1, 1), (1, 2)), R0 | M1),
+    (((0, 3), (0, 4), (0, 5), (1, 1), (1, 2), (1, 3), (1, 4)), R1 | M2),
+    (((0, 1), (0, 2), (0, 3), (1, 0), (1, 1), (1, 2), (2, 0)), R2 | M3),
+    (((0, 1), (0, 2), (0, 3), (1, 0), (1, 1), (1, 2), (1, 3)), R3 | M4),
+    (((0, 1), (0, 2), (0, 3), (0, 4), (1, 0), (1, 1), (1, 2)), R4 | M5),
+    (((0, 3), (1, 1), (1, 2), (1, 3), (2, 0), (2, 1), (2, 2)), R5 | M0),
+  ],
+  "I7": [
+    (((0, 0), (0, 1), (1, 0), (1, 1), (2, 0), (2, 1), (3, 0)), R0 | M3),
+    (((0, 1), (0, 2), (0, 3), (0, 4), (0, 5), (0, 6), (0, 7)), R1 | M4),
+    (((0, 5), (0, 6), (1, 3), (1, 4), (2, 1), (2, 2), (3, 0)), R2 | M5),
+    (((0, 1), (1, 0), (1, 1), (2, 0), (2, 1), (3, 0), (3, 1)), R3 | M0),
+    (((0, 0), (0, 1), (0, 2), (0, 3), (0, 4), (0, 5), (0, 6)), R4 | M1),
+    (((0, 7), (1, 5), (1, 6), (2, 3), (2, 4), (3, 1), (3, 2)), R5 | M2),
+  ],
+  "t8": [
+    (((0, 0), (0, 1), (0, 2), (0, 3), (1, 0), (1, 1), (1, 2), (2, 0)), R0 | M3),
+    (((0, 3), (0, 4), (0, 5), (1, 1), (1, 2), (1, 3), (1, 4), (1, 5)), R1 | M4),
+    (((0, 1), (0, 2), (0, 3), (0, 4), (1, 0), (1, 1), (1, 2), (2, 0)), R2 | M5),
+    (((0, 3), (1, 1), (1, 2), (1, 3), (2, 0), (2, 1), (2, 2), (2, 3)), R3 | M0),
+    (((0, 0), (0, 1), (0, 2), (0, 3), (0, 4), (1, 0), (1, 1), (1, 2)), R4 | M1),
+    (((0, 5), (1, 3), (1, 4), (1, 5), (2, 1), (2, 2), (2, 3), (2, 4)), R5 | M2),
+  ],
+  "d8": [
+    (((0, 0), (0, 1), (0, 2), (0, 3), (1, 0), (1, 1), (1, 2), (1, 3)), R0 | R3 | M1 | M4),
+    (((0, 3), (0, 4), (0, 5), (0, 6), (1, 1), (1, 2), (1, 3), (1, 4)), R1 | R4 | M2 | M5),
+    (((0, 3), (1, 1), (1, 2), (1, 3), (2, 0), (2, 1), (2, 2), (3, 0)), R2 | R5 | M0 | M3),
+  ],
+}
 
 # prototypes of convex polyiamonds that fit in a 24-hex grid
 protos = {
@@ -112,17 +398,55 @@ def shapes(ps, flags="ALL", as_map=1):
     s.append(list(x for (x, f) in v if f & flags))
   return (dict(zip(ps, s)) if as_map else s)
 
+# normalise position of cells
+def normalise(cs):
+  cs = list(cs)
+  mx = min(x for (x, y) in cs)
+  my = min(y for (x, y) in cs)
+  my -= my % 2
+  return tuple(sorted((x - mx, y - my) for (x, y) in cs))
+
+# the orientations computed by orientations() are cached, keyed by the
+# normalised prototype, and the least recently used entries are discarded
+# when there are more than <orientations_cache_size> entries
+#
+# the cache can be saved to (and loaded from) a file, using
+# save_orientations() and load_orientations()
+orientations_cache = OrderedDict()
+orientations_cache_size = 1024
+
 # compute canonical orientations of a shape from a prototype
 def orientations(proto, flags="ALL", verbose=0, indent=""):
   flags = shape_flags.get(flags, flags)
+  k = normalise(proto)
+  rs = orientations_cache.pop(k, None)
+  if rs is None:
+    rs = _orientations(k)
+    # discard the least recently used entries
+    while len(orientations_cache) >= orientations_cache_size:
+      orientations_cache.popitem(last=False)
+  orientations_cache[k] = rs
 
-  # normalise position of cells
-  def normalise(cs):
-    cs = list(cs)
-    mx = min(x for (x, y) in cs)
-    my = min(y for (x, y) in cs)
-    my -= my % 2
-    return tuple(sorted((x - mx, y - my) for (x, y) in cs))
+  # select the required orientations
+  rs = list((k, v) for (k, v) in rs if flags & v)
+
+  if verbose:
+    for (k, v) in rs:
+      v = list("RM"[i] + "012345"[j] for (i, j) in (divmod(x, 6) for x in _bits(v)))
+      printf("{indent}({k}, {v}),", k=k, v=join(v, sep=" | "))
+
+  return rs
+
+# return bits set in v
+def _bits(v):
+  n = 0
+  while v:
+    if v & 1: yield n
+    v >>= 1
+    n += 1
+
+# compute all orientations of the normalised prototype <cs>
+def _orientations(cs):
 
   # mirror in horizontal axis
   def mirror(cs):
@@ -140,17 +464,8 @@ def orientations(proto, flags="ALL", verbose=0, indent=""):
     else:
       d[k] = v
 
-  # return bits set in v
-  def bits(v):
-    n = 0
-    while v:
-      if v & 1: yield n
-      v >>= 1
-      n += 1
-
   # accumulate shapes by orientation
   d = dict()
-  cs = normalise(proto)
   ms = mirror(cs)
   for i in irange(0, 5):
     add(d, cs, i)
@@ -160,53 +475,153 @@ def orientations(proto, flags="ALL", verbose=0, indent=""):
     ms = rotate(ms)
 
   # collect the results in order
-  rs = ((k, v) for (k, v) in d.items() if flags & v)
-  rs = sorted(rs, key=unpack(lambda k, v: peek(bits(v))))
+  return sorted(d.items(), key=unpack(lambda k, v: peek(_bits(v))))
 
-  if verbose:
-    for (k, v) in rs:
-      v = list("RM"[i] + "012345"[j] for (i, j) in (divmod(x, 6) for x in bits(v)))
-      printf("{indent}({k}, {v}),", k=list(k), v=join(v, sep=" | "))
+# save the cached orientations to file <path>
+def save_orientations(path):
+  import pickle
+  with open(path, "wb") as f:
+    pickle.dump(list(orientations_cache.items()), f, protocol=pickle.HIGHEST_PROTOCOL)
+
+# load cached orientations from file <path> (saved by save_orientations())
+def load_orientations(path):
+  import pickle
+  with open(path, "rb") as f:
+    for (k, rs) in pickle.load(f):
+      orientations_cache.pop(k, None)
+      while len(orientations_cache) >= orientations_cache_size:
+        orientations_cache.popitem(last=False)
+      orientations_cache[k] = rs
 
+# canonical forms (see: polyominoes.canonical_forms())
+#
+# by default each shape is processed separately (using orientations(),
+# so the orientations of repeated shapes are cached). with
+# backend="numpy" the shapes are processed together (grouped by size)
+# as numpy arrays.
+def canonical_forms(ss, flags="ALL", backend=None):
+  flags = shape_flags.get(flags, flags)
+  ss = list(ss)
+  np = (arrays.numpy() if backend == "numpy" else None)
+  if np: return arrays.canonical_forms(np, ss, flags, _orientation_keys)
+  rs = list()
+  for s in ss:
+    vs = orientations(s, flags)
+    k = min(v for (v, f) in vs)
+    rs.append((k, dict(vs)[k]))
   return rs
 
+# the (sorted) cells of each orientation of the shapes in array <a>
+# (rotations of the shape, then of its mirror image)
+# (see: arrays.canonical_forms())
+def _orientation_keys(np, a):
+  # normalise position of cells
+  def normalise(x, y):
+    my = y.min(1, keepdims=True)
+    return (x - x.min(1, keepdims=True), y - (my - my % 2))
+  cs = normalise(a[:, :, 0], a[:, :, 1])
+  ms = normalise(cs[0] + (cs[1] + 1) // 2, -(cs[1] + 1))
+  os = [None] * 12
+  for i in irange(0, 5):
+    (os[i], os[i + 6]) = (cs, ms)
+    cs = normalise(-1 - cs[1] // 2, 2 * cs[0] + cs[1] + 1)
+    ms = normalise(-1 - ms[1] // 2, 2 * ms[0] + ms[1] + 1)
+  m = 1 + max(int(y.max()) for (x, y) in os)
+  return (list(np.sort(x * m + y, axis=1) for (x, y) in os), m)
+
 # generate placements for piece <p> in grid <grid>
 def placements(p, grid):
-  xmax = max(x for (x, y) in grid)
+  for (m, q) in placement_masks(p, grid):
+    yield q
+
+# the grid is mapped to a bitmask, with bit (x + w * y) for cell (x, y),
+# where w = 1 + max(x) (grid coordinates are non-negative)
+def grid_mask(grid):
+  w = 1 + max(x for (x, y) in grid)
+  return (w, sum(1 << (x + w * y) for (x, y) in grid))
+
+# generate placements for piece <p> in grid <grid>, as (<mask>, <cells>)
+# (offsets are considered in order of increasing y, then increasing x)
+def placement_masks(p, grid):
+  (w, g) = grid_mask(grid)
+  xmax = w - 1
   ymax = max(y for (x, y) in grid)
   for q in p:
-    dx = dy = 0
-    q_ = q
-    while True:
-      while True:
-        if grid.issuperset(q_):
-          yield q_
-        # increase x
-        dx += 1
-        q_ = list((x + dx, y + dy) for (x, y) in q)
-        if all(x > xmax for (x, y) in q_): break
-      # increase y
-      dx = 0
-      dy += 2
-      q_ = list((x + dx, y + dy) for (x, y) in q)
-      if all(y > ymax for (x, y) in q_): break
+    # the mask and bounding box of the orientation
+    m = sum(1 << (x + w * y) for (x, y) in q)
+    (qx, qy) = (max(x for (x, y) in q), max(y for (x, y) in q))
+    # consider offsets that keep the piece within the bounding box of the grid
+    # (moving by 2 in the y direction preserves the orientation of the triangles)
+    for dy in irange(0, ymax - qy, step=2):
+      for dx in irange(0, xmax - qx):
+        m_ = m << (dx + w * dy)
+        if m_ & g == m_:
+          yield (m_, list((x + dx, y + dy) for (x, y) in q))
+
+# exact cover using bitmasks (lowest empty cell first)
+#
+# choose one placement from each of the sequences of (<mask>, <cells>)
+# placements in <mss> so that the masks exactly cover <tgt>
+# return the chosen <cells> for each sequence
+def exact_cover_bits(mss, tgt):
+  n = len(mss)
+  # index the placements by their lowest bit
+  d = dict()
+  for (i, ms) in enumerate(mss):
+    for (m, cs) in ms:
+      d.setdefault((m & -m).bit_length() - 1, list()).append((i, m, cs))
+  used = [0] * n
+  soln = [None] * n
+
+  def solve(t):
+    if t == 0:
+      yield tuple(soln)
+    else:
+      # fill the lowest empty cell
+      for (i, m, cs) in d.get((t & -t).bit_length() - 1, ()):
+        if used[i] or m & t != m: continue
+        used[i] = 1
+        soln[i] = cs
+        for z in solve(t ^ m): yield z
+        used[i] = 0
+
+  for z in solve(tgt): yield z
+
+# exact cover engines: map <name> -> exact_cover() function
+# (the "bits" engine uses exact_cover_bits())
+engines = {
+  None: exact_cover,
+  "X": exact_cover,
+  "dlx": dlx.exact_cover,
+}
 
 # fit pieces <ps> into grid <grid>
 # <start> is the starting label for the pieces
 # <accept> is used to determine acceptable placements
-def fit(ps, grid, start=1, accept=None):
+# <engine> selects the exact cover engine (see: engines, or "bits")
+def fit(ps, grid, start=1, accept=None, engine=None):
   # check the dimensions of the pieces
   assert sum(len(p[0]) for p in ps) == len(grid)
 
-  # create the sets for exact_cover
-  sss = list()
-  for p in ps:
-    ss = list(filter(accept, placements(p, grid)))
-    if not ss: return
-    sss.append(ss)
+  if engine == "bits":
+    # use the placement masks directly
+    sss = list()
+    for p in ps:
+      ss = list((m, q) for (m, q) in placement_masks(p, grid) if accept is None or accept(q))
+      if not ss: return
+      sss.append(ss)
+    rss = exact_cover_bits(sss, grid_mask(grid)[1])
+  else:
+    # create the sets for exact_cover
+    sss = list()
+    for p in ps:
+      ss = list(filter(accept, placements(p, grid)))
+      if not ss: return
+      sss.append(ss)
+    rss = engines[engine](sss, grid)
 
   # solve the exact cover
-  for rs in exact_cover(sss, grid):
+  for rs in rss:
     # return a map of grid cells to piece number
     g = dict()
     for (i, cs) in enumerate(rs, start=start):
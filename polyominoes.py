@@ -7,11 +7,17 @@ from __future__ import print_function
 
 from enigma import (
   enigma, algorithmX, seq_all_same_r, basestring, chunk, unpack, join,
-  arg, args, printf
+  irange, arg, args, printf
 )
 
+from collections import OrderedDict
+from itertools import islice
+
+import arrays
+import dlx
+
 __author__ = "Jim Randell <jim.randell@gmail.com>"
-__version__ = "2025-07-01"
+__version__ = "2026-10-17"
 
 polyominoes = enigma.module(__name__)
 
@@ -27,8 +33,21 @@ polyominoes = enigma.module(__name__)
 # M3 = mirrored and rotated 270 degrees
 (R0, R1, R2, R3, M0, M1, M2, M3) = (1, 2, 4, 8, 16, 32, 64, 128)
 
-# shape data
-polyominoes_data = dict()
+# shape data (name -> orientations)
+#
+# shapes are added when their order is populated (see: populate()), so
+# iterating over polyominoes_data only gives the shapes populated so far,
+# but looking up a shape by name populates its order (if necessary)
+class _ShapeData(dict):
+
+  def __missing__(self, k):
+    n = _order(k)
+    if n and n not in populated:
+      populate([n])
+      if k in self: return self[k]
+    raise KeyError(k)
+
+polyominoes_data = _ShapeData()
 
 # polyomino templates
 template = dict()
@@ -115,10 +134,47 @@ template[6] = [
 
 populated = set()
 
+# indices of the polyominoes data for each <flags> value used, as a pair:
+#   <orientations> -> [<name>, ...]  (the selected orientations of each shape)
+#   <orientation> -> <name>  (each selected orientation, first name only)
+# these are maintained as shapes are added
+_indices = dict()
+
+# the key used to index a sequence of orientations
+def _key(v):
+  return tuple(tuple(map(tuple, q)) for q in v)
+
+# add shape <n> with orientation data <v> to the indices for <flags>
+def _index_shape(flags, n, v):
+  (d1, d2) = _indices[flags]
+  v = list(x for (x, f) in v if f & flags)
+  d1.setdefault(_key(v), list()).append(n)
+  for x in v: d2.setdefault(x, n)
+
+# the indices for <flags>
+def _index(flags):
+  if flags not in _indices:
+    _indices[flags] = (dict(), dict())
+    for (n, v) in polyominoes_data.items():
+      _index_shape(flags, n, v)
+  return _indices[flags]
+
+# add shape <n> with orientation data <v>
+def _add_shape(n, v):
+  polyominoes_data[n] = v
+  for flags in _indices.keys():
+    _index_shape(flags, n, v)
+
 # populate the polyominoes data from templates
+# (orders without templates are generated, see: generated())
 def populate(ks):
   for k in ks:
     if k in populated: continue
+    if k not in template:
+      for (n, v) in generated(k).items():
+        _add_shape(n, v)
+      populated.add(k)
+      continue
     for (n, f, s) in template[k]:
       # determine layout width
       ss = s.split('|')
@@ -132,13 +188,118 @@ def populate(ks):
           if c != ' ': ps.append((x, y))
       assert len(ps) == k
       # populate the orientations
-      polyominoes_data[n] = orientations(ps)
+      _add_shape(n, orientations(ps))
       # and the mirror image for chiral shapes
       if f:
         ps = list((w - x, y) for (x, y) in ps)
-        polyominoes_data[n + "'"] = orientations(ps)
+        _add_shape(n + "'", orientations(ps))
     populated.add(k)
 
+# generated polyominoes:
+#
+# polyominoes of orders without templates are generated using
+# Redelmeier's method, and are named "<order>-<number>" (numbered in
+# order of their canonical forms), with the mirror image of a chiral
+# polyomino named "<order>-<number>'".
+#
+# the generated data can be cached in a file for each order in
+# <cache_dir> (e.g. ~/.cache/polyominoes). this is disabled by default
+# (cache_dir = ""). the files hold the data as JSON (so nothing but
+# plain data is read back), and are named using the version of this
+# module, so files written by other versions are not used.
+cache_dir = ""
+
+# generate fixed polyominoes of order <n> (Redelmeier's method)
+def fixed_polyominoes(n):
+  adj = ((1, 0), (0, 1), (-1, 0), (0, -1))
+  # cells that are in, or adjacent to, the current polyomino
+  seen = set([(0, 0)])
+  def extend(ps, untried):
+    untried = list(untried)
+    while untried:
+      c = untried.pop()
+      ps.append(c)
+      if len(ps) == n:
+        yield tuple(ps)
+      else:
+        (x, y) = c
+        # new neighbours (only cells after (0, 0) are allowed)
+        ns = list()
+        for (dx, dy) in adj:
+          d = (x + dx, y + dy)
+          if (d[1] > 0 or (d[1] == 0 and d[0] >= 0)) and d not in seen:
+            ns.append(d)
+        seen.update(ns)
+        for z in extend(ps, untried + ns): yield z
+        seen.difference_update(ns)
+      ps.pop()
+  return extend([], [(0, 0)])
+
+# generate free polyominoes of order <n>
+# return (<name>, <orientations>) pairs
+def free_polyominoes(n):
+  R = shape_flags["ONE_SIDED"]
+  # canonical form (under all orientations) -> chiral?
+  d = dict()
+  for ss in chunk(fixed_polyominoes(n), 4096):
+    for (k, f) in canonical_forms(ss):
+      if k not in d:
+        # chiral shapes have a mirror image that is not a rotation (so
+        # the canonical form is reached by only rotations, or only
+        # reflections)
+        d[k] = not (f & R and f & ~R)
+  for (i, k) in enumerate(sorted(d.keys()), start=1):
+    name = "{n}-{i}".format(n=n, i=i)
+    yield (name, orientations(k))
+    if d[k]:
+      yield (name + "'", orientations(list((-x, y) for (x, y) in k)))
+
+# the cache file for polyominoes of order <n> (or None)
+def cache_path(n):
+  import os
+  if not cache_dir: return
+  d = os.path.expanduser(cache_dir)
+  return os.path.join(d, "polyominoes-{v}-{n}.json".format(v=__version__, n=n))
+
+# return a dict of generated polyominoes of order <n> (using the cache, if enabled)
+def generated(n):
+  import os
+  import json
+  path = cache_path(n)
+  if path and os.path.exists(path):
+    with open(path) as f:
+      try:
+        # convert the lists back to tuples
+        d = json.load(f)
+        return dict((str(k), tuple((tuple(map(tuple, ps)), x) for (ps, x) in v)) for (k, v) in d.items())
+      except (ValueError, TypeError, AttributeError):
+        # the file is damaged (so it is regenerated)
+        pass
+  d = dict(free_polyominoes(n))
+  if path:
+    if not os.path.isdir(os.path.dirname(path)): os.makedirs(os.path.dirname(path))
+    with open(path, "w") as f:
+      json.dump(d, f, separators=(",", ":"))
+  return d
+
+# map template names -> order
+def _template_orders():
+  d = dict()
+  for (k, vs) in template.items():
+    for (n, f, _) in vs:
+      d[n] = k
+      if f: d[n + "'"] = k
+  return d
+
+_template_order = _template_orders()
+
+# the order of the shape with (unaliased) name <p> (or None)
+def _order(p):
+  k = _template_order.get(p)
+  if k: return k
+  (k, _, n) = p.partition('-')
+  if k.isdigit() and n.rstrip("'").isdigit(): return int(k)
+
 # aka names, map aka -> polyomino name
 akas = {
   "L3": "V3",
@@ -167,15 +328,38 @@ def shapes(ps, flags="ALL", as_map=0):
   flags = shape_flags.get(flags, flags)
   s = list()
   for p in ps:
-    s.append(list(x for (x, f) in polyominoes_data[akas.get(p, p)] if f & flags))
+    k = akas.get(p, p)
+    # shapes are populated on demand
+    if k not in polyominoes_data:
+      n = _order(k)
+      if n: populate([n])
+    s.append(list(x for (x, f) in polyominoes_data[k] if f & flags))
   return (dict(zip(ps, s)) if as_map else s)
 
 # look up polyomino names from shape orientations
+# (<ss> is a sequence of shapes, as returned by shapes())
 def names(ss, flags="ALL"):
   flags = shape_flags.get(flags, flags)
-  for (k, v) in polyominoes_data.items():
-    v = list(x for (x, f) in v if f & flags)
-    if v in ss: yield k
+  ss = list(ss)
+  # make sure shapes of the required orders are populated
+  populate(set(len(v[0]) for v in ss if v))
+  d = _index(flags)[0]
+  seen = set()
+  for v in ss:
+    for k in d.get(_key(v), ()):
+      if k not in seen:
+        yield k
+        seen.add(k)
+
+# classify a collection of shapes <ss>, each given as a collection of
+# squares (in any position), using orientations selected by <flags>
+# return a list of the corresponding names (or None if not recognised)
+def classify(ss, flags="ALL"):
+  flags = shape_flags.get(flags, flags)
+  ss = list(_normalise(s) for s in ss)
+  populate(set(len(s) for s in ss))
+  d = _index(flags)[1]
+  return list(d.get(s) for s in ss)
 
 # useful routines for computing orientations of shapes
 def orientations(ss, flags="ALL", verbose=0, indent=""):
@@ -220,52 +404,224 @@ def orientations(ss, flags="ALL", verbose=0, indent=""):
 
   return tuple((ps, sum(1 << f for f in fs)) for (ps, fs) in rs)
 
+# canonical forms:
+#
+# canonical_forms() finds the canonical form of each of a collection of
+# shapes (the smallest of its orientations), along with the orientation
+# flags of the canonical form. for each shape <ss> the result is the
+# same as:
+#
+#   vs = orientations(ss, flags)
+#   k = min(v for (v, f) in vs)
+#   (k, dict(vs)[k])
+#
+# but the shapes are processed together. by default each shape is
+# converted to a bitmap, and its orientations are found using lookup
+# tables (for each byte of the bitmap). with backend="numpy" the shapes
+# are processed (grouped by size) as numpy arrays.
+
+def canonical_forms(ss, flags="ALL", backend=None):
+  flags = shape_flags.get(flags, flags)
+  ss = list(ss)
+  if backend == "numpy":
+    np = arrays.numpy()
+    if np: return arrays.canonical_forms(np, ss, flags, _orientation_keys)
+
+  # normalise the shapes, and find the size of the box they fit in
+  (ns, h) = (list(), 1)
+  for s in ss:
+    (xs, ys) = (list(x for (x, y) in s), list(y for (x, y) in s))
+    (mx, my) = (min(xs), min(ys))
+    (w, d) = (max(xs) - mx + 1, max(ys) - my + 1)
+    ns.append((list(zip((x - mx for x in xs), (y - my for y in ys))), w, d))
+    h = max(h, w, d)
+  (tables, shifts, b) = _orientation_tables(h)
+
+  rs = list()
+  for (s, w, d) in ns:
+    # make the bitmap (bit x * h + y is set for square (x, y))
+    v = 0
+    for (x, y) in s: v |= 1 << (x * h + y)
+    # find the (normalised) bitmaps of the orientations
+    vs = list()
+    for (tb, ss) in zip(tables, shifts):
+      (r, i) = (0, 0)
+      c = v
+      while c:
+        r |= tb[i][c & 255]
+        c >>= 8
+        i += 1
+      vs.append(r >> ss[w][d])
+    # choose the smallest allowed orientation (the one that has the
+    # lowest bit where the bitmaps differ)
+    z = None
+    for (k, r) in enumerate(vs):
+      if not (flags >> k) & 1: continue
+      if z is None or (r != z and (r ^ z) & -(r ^ z) & r): z = r
+    # and return it as a sequence of squares
+    (cs, c) = (list(), z)
+    while c:
+      i = c & -c
+      cs.append(divmod(i.bit_length() - 1, b))
+      c ^= i
+    rs.append((tuple(cs), sum(1 << k for (k, r) in enumerate(vs) if r == z)))
+  return rs
+
+# the orientation of square (x, y) corresponding to bit <k> of the flags
+def _orientation(x, y, k):
+  if k > 3: (x, k) = (-x, k - 4)
+  for _ in range(k): (x, y) = (y, -x)
+  return (x, y)
+
+# lookup tables to find the orientations of shapes that fit in an <h> x <h> box
+#
+# return (<tables>, <shifts>, <b>), where <tables>[k][i][v] is the bitmap
+# of orientation <k> of byte <i> of a bitmap (with value <v>) placed in
+# a <b> x <b> box (<b> = 2h - 1), and <shifts>[k][w][d] is the shift
+# needed to normalise orientation <k> of a <w> x <d> shape
+_orientation_tables_cache = dict()
+def _orientation_tables(h):
+  r = _orientation_tables_cache.get(h)
+  if r is None:
+    b = 2 * h - 1
+    # the bits of each square in the box, for each orientation
+    bits = list()
+    for k in irange(0, 7):
+      bs = list()
+      for i in range(h * h):
+        (x, y) = _orientation(*divmod(i, h), k=k)
+        bs.append(1 << ((x + h - 1) * b + (y + h - 1)))
+      bits.append(bs)
+    tables = list()
+    for bs in bits:
+      tb = list()
+      for i in range(0, h * h, 8):
+        t = [0] * 256
+        for v in irange(1, 255):
+          t[v] = sum(bs[i + j] for j in range(8) if (v >> j) & 1 and i + j < h * h)
+        tb.append(t)
+      tables.append(tb)
+
+    # the shifts are found from the smallest position of the corners of the shape
+    shifts = list()
+    for k in irange(0, 7):
+      ss = [None]
+      for w in irange(1, h):
+        ss.append([None])
+        for d in irange(1, h):
+          cs = list(_orientation(x, y, k) for (x, y) in ((0, 0), (w - 1, 0), (0, d - 1), (w - 1, d - 1)))
+          (x, y) = (min(x for (x, y) in cs), min(y for (x, y) in cs))
+          ss[w].append((x + h - 1) * b + (y + h - 1))
+      shifts.append(ss)
+
+    r = _orientation_tables_cache[h] = (tables, shifts, b)
+  return r
+
+# the (sorted) squares of each orientation of the shapes in array <a>
+# (see: arrays.canonical_forms())
+def _orientation_keys(np, a):
+  (x, y) = (a[:, :, 0], a[:, :, 1])
+  m = 1 + int(max((x.max(1) - x.min(1)).max(), (y.max(1) - y.min(1)).max()))
+  ks = list()
+  for (u, v) in ((x, y), (-x, y)):
+    for i in (0, 1, 2, 3):
+      ks.append(np.sort((u - u.min(1, keepdims=True)) * m + (v - v.min(1, keepdims=True)), axis=1))
+      (u, v) = (v, -u)
+  return (ks, m)
+
 # extend the available shapes using the <name> -> <shape> data in d
 def extend(d):
   assert 0, "DEPRECATED!"
   for (k, v) in d.items():
     polyominoes_data[k] = orientations(v)
 
+# placements of pieces (without holes) are cached, keyed by (<orientations>, <x>, <y>)
+# each placement is stored as (<mask>, <indices>), where <mask> has bit <k>
+# set for each occupied linear index <k>
+#
+# the least recently used entries are discarded when there are more than
+# <placements_cache_size> entries
+placements_cache = OrderedDict()
+placements_cache_size = 256
+
+# return the cached placements for piece <p> in an <x> x <y> grid
+def placement_masks(p, x, y):
+  k = (tuple(tuple(map(tuple, q)) for q in p), x, y)
+  v = placements_cache.pop(k, None)
+  if v is None:
+    v = list()
+    for q in p:
+      # try to place the piece at <x0>, <y0>
+      for y0 in range(y):
+        for x0 in range(x):
+          ss = list()
+          for (dx, dy) in q:
+            (i, j) = (x0 + dx, y0 + dy)
+            if not (i < x and j < y): break
+            ss.append(i + x * j)
+          else:
+            v.append((sum(1 << i for i in ss), tuple(ss)))
+    # discard the least recently used entries
+    while len(placements_cache) >= placements_cache_size:
+      placements_cache.popitem(last=False)
+  placements_cache[k] = v
+  return v
+
 # generate placements for piece <p> in an <x> x <y> grid, avoiding <holes>
 # <p> is a sequence of possible orientations for the piece
 # return the linear indices of the occupied squares
 def placements(p, x, y, holes):
-  for q in p:
-    # try to place the piece at <x0>, <y0>
-    for y0 in range(y):
-      for x0 in range(x):
-        ss = list()
-        for (dx, dy) in q:
-          (i, j) = (x0 + dx, y0 + dy)
-          if not (i < x and j < y): break
-          if (i, j) in holes: break
-          ss.append(i + x * j)
-        else:
-          yield ss
-
-def fit(ps, x, y, holes=set(), fn=None):
+  h = sum(1 << (i + x * j) for (i, j) in holes if 0 <= i < x and 0 <= j < y)
+  for (m, ss) in placement_masks(p, x, y):
+    if not (m & h):
+      yield list(ss)
 
-  # check the dimensions of the pieces
-  assert not (sum(len(p[0]) for p in ps) + len(holes) > x * y), "Impossible!"
+# exact cover engines: map <name> -> algorithmX() function
+engines = {
+  None: algorithmX,
+  "X": algorithmX,
+  "dlx": dlx.algorithmX,
+}
 
-  # how to format the results
-  # each grid is calculated as a linear list
-  # default is to chunk it into rows
-  if fn is None: fn = lambda g: list(chunk(g, x))
+# repeated pieces:
+#
+# a piece can be given as a (<piece>, <count>) pair, to specify <count>
+# identical copies of it. the placements of the piece appear once in the
+# matrix, and its indicator column must be covered <count> times (using
+# the DLX engine), so the copies are not placed in every possible order.
+# the copies are labelled consecutively (in order of their first square).
 
-  # set up the matrix for algorithm X
+# separate pieces <ps> into (<pieces>, <counts>)
+# (<counts> is None if there are no repeated pieces)
+def _pieces(ps):
+  (qs, ks) = (list(), list())
+  for p in ps:
+    k = 1
+    if isinstance(p, tuple) and len(p) == 2 and isinstance(p[1], int): (p, k) = p
+    qs.append(p)
+    ks.append(k)
+  return (qs, (ks if any(k != 1 for k in ks) else None))
+
+# the column multiplicities for pieces with <counts> in a grid with <xy> squares
+def _mult(counts, xy):
+  if counts: return dict((xy + i, k) for (i, k) in enumerate(counts) if k != 1)
 
-  # for each piece, in each orientation, and each position we add a
-  # row of the form:
-  #
-  #   <squares occupied> + <indicator for the piece>
-  #
-  # where:
-  #
-  #   <squares> is a boolean <x> * <y> vector
-  #   <indicator> is a boolean <len(ps)> vector
-  #
-  # (if we add no rows for a piece, then the problem is not soluble)
+# set up the matrix for algorithm X, to fit pieces <ps> into an <x> x <y>
+# grid, avoiding <holes>
+#
+# for each piece, in each orientation, and each position we add a
+# row of the form:
+#
+#   <squares occupied> + <indicator for the piece>
+#
+# where:
+#
+#   <squares> is a boolean <x> * <y> vector
+#   <indicator> is a boolean <len(ps)> vector
+#
+# (if we add no rows for a piece, then the problem is not soluble, and
+# None is returned)
+def _matrix(ps, x, y, holes):
 
   Y = list()
 
@@ -286,40 +642,569 @@ def fit(ps, x, y, holes=set(), fn=None):
     squares.append(xy + n)
     Y.append(squares)
 
-  # set up X as a dict of sets
-  X = dict((k, set()) for k in range(n + xy + bool(holes)))
+  return Y
+
+# set up X as a dict of sets (for <k> columns), from rows <Y>
+def _columns(Y, k):
+  X = dict((k, set()) for k in range(k))
   for (i, y) in enumerate(Y):
     for k in y:
       X[k].add(i)
+  return X
 
-  # find exact covers using algorithm X
-  for rs in algorithmX(X, Y, list()):
+# the first label for each of <n> pieces (with <counts>), followed by
+# the label for the holes
+def _piece_labels(n, counts=None):
+  ls = list(range(1, n + 1))
+  if counts:
+    ls = list()
+    k = 1
+    for c in counts:
+      ls.append(k)
+      k += c
+  ls.append(0)
+  return ls
+
+# produce grids for the exact covers <rss> of matrix <Y>
+# for <n> pieces (with <counts>) in a grid with <xy> squares
+def _grids(Y, rss, n, xy, counts=None):
+  labels = _piece_labels(n, counts)
+  for rs in rss:
     # produce the grid
     g = [None] * xy
+    # label the grid
+    # 0 = hole
+    # 1+ = piece number
+    ls = list(labels)
+    if counts: rs = sorted(rs, key=(lambda r: min(Y[r][:-1])))
     for r in rs:
-      # label the grid
-      # 0 = hole
-      # 1+ = piece number
-      k = (Y[r][-1] + 1 - xy) % (n + 1)
+      k = Y[r][-1] - xy
       for i in Y[r][:-1]:
-        g[i] = k
+        g[i] = ls[k]
+      if k < n: ls[k] += 1
+    yield g
+
+# symmetry breaking:
+#
+# the symmetries of the board are the transformations of the <x> x <y>
+# grid that map the holes to themselves (and also map the orientations
+# of each piece to orientations of the same piece). a piece is chosen
+# and only placements that are minimal under these symmetries are
+# allowed for it, so each solution is found once. if the chosen piece
+# is placed symmetrically a solution may be found more than once, so
+# these solutions are remembered (if there is an asymmetric piece it is
+# chosen, and this doesn't happen).
+
+# normalise a collection of squares
+def _normalise(ss):
+  ss = list(ss)
+  (mx, my) = (min(x for (x, y) in ss), min(y for (x, y) in ss))
+  return tuple(sorted((x - mx, y - my) for (x, y) in ss))
+
+# the non-identity symmetries of an <x> x <y> board with pieces <ps> and
+# <holes>, as maps of linear indices
+def _symmetries(ps, x, y, holes):
+  (X, Y) = (x - 1, y - 1)
+  fs = [
+    (lambda i, j: (X - i, j)),
+    (lambda i, j: (i, Y - j)),
+    (lambda i, j: (X - i, Y - j)),
+  ]
+  if x == y:
+    fs.extend([
+      (lambda i, j: (j, i)),
+      (lambda i, j: (X - j, i)),
+      (lambda i, j: (j, Y - i)),
+      (lambda i, j: (X - j, Y - i)),
+    ])
+  holes = set(holes)
+  ts = list()
+  for f in fs:
+    # the holes must map to holes
+    if set(f(i, j) for (i, j) in holes) != holes: continue
+    # and the orientations of each piece must map to orientations of the piece
+    if not _preserves(f, ps): continue
+    ts.append(list(i + x * j for (i, j) in (f(i, j) for j in range(y) for i in range(x))))
+  return ts
+
+# does transformation <f> map the orientations of each of the pieces <ps>
+# to orientations of the same piece?
+def _preserves(f, ps):
+  return all(set(_normalise(f(i, j) for (i, j) in q) for q in p) == set(map(_normalise, p)) for p in ps)
+
+# restrict the placements of one of the pieces in matrix <Y> (for <n>
+# pieces (with <counts>) in a grid with <xy> squares) using symmetries <ts>
+# return (<Y>, <k>, <fixed>) where <k> is the label of the chosen piece,
+# and <fixed> is the set of its allowed placements that are symmetric
+# (if every piece is repeated no piece is chosen, and <k> is None)
+def _break_symmetry(Y, ts, n, xy, counts=None):
+  # the rows for each piece: <index> -> (<minimal>, <fixed>)
+  d = dict()
+  for (r, v) in enumerate(Y):
+    k = v[-1] - xy
+    if k == n: continue # holes
+    ss = tuple(sorted(v[:-1]))
+    vs = list(tuple(sorted(t[i] for i in ss)) for t in ts)
+    (rs, fs) = d.setdefault(k, (list(), set()))
+    if all(ss <= x for x in vs):
+      rs.append(r)
+      if ss in vs: fs.add(ss)
+  # choose a piece with the fewest symmetric placements (and the most rows removed)
+  ks = list(k for k in d.keys() if not (counts and counts[k] > 1))
+  if not ks: return (Y, None, None)
+  k = min(ks, key=(lambda k: (len(d[k][1]), len(d[k][0]))))
+  (rs, fs) = d[k]
+  rs = set(rs)
+  Y = list(v for (r, v) in enumerate(Y) if r in rs or v[-1] - xy != k)
+  return (Y, _piece_labels(n, counts)[k], fs)
+
+# pruning:
+#
+# after each placement the empty squares of the board are divided into
+# connected regions, and if the size of any region is not the total area
+# of some collection of the remaining pieces (e.g. a region of 3 squares
+# when only pentominoes remain) the partial solution is abandoned. this
+# is only a check on each region separately (the regions are not
+# checked to be fillable by disjoint collections of pieces). the search
+# is done using the DLX engine (which supports a prune function), so
+# <prune> cannot be used with other engines.
+
+# check <engine> can be used with <prune>
+def _check_prune(prune, engine):
+  if prune and not (engine is None or engine == "dlx"):
+    raise ValueError("prune is only supported by the DLX engine (engine={e!r})".format(e=engine))
+
+# make a prune function for matrix <Y> (with pieces <ps>), where the
+# first <len(squares)> columns correspond to the (x, y) squares in
+# <squares>, and the following columns are the indicators for the pieces
+# (squares in <filled> are treated as filled)
+# (and <counts> are the numbers of each piece)
+def _pruner(Y, ps, squares, filled=(), counts=None):
+  xy = len(squares)
+  # map squares to bits (with an empty column to separate the rows)
+  (mx, my) = (min(x for (x, y) in squares), min(y for (x, y) in squares))
+  w = 2 + max(x for (x, y) in squares) - mx
+  bs = list(1 << (x - mx + w * (y - my)) for (x, y) in squares)
+  empty = sum(bs[k] for (k, c) in enumerate(squares) if c not in filled)
+  # the mask of the squares, and the piece, for each row
+  ms = list(sum(bs[k] for k in v if k < xy) for v in Y)
+  ks = list(max(v) - xy for v in Y)
+  areas = list(len(p[0]) for p in ps)
+  if counts is None: counts = [1] * len(ps)
+
+  def prune(rs):
+    # the remaining empty squares
+    e = empty
+    for r in rs: e &= ~ms[r]
+    # the subset sums of the areas of the remaining pieces (as a bitmask)
+    left = list(counts) + [0]
+    for r in rs: left[ks[r]] -= 1
+    t = 1
+    for (k, a) in enumerate(areas):
+      for _ in range(left[k]): t |= t << a
+    # check the size of each connected region of empty squares
+    while e:
+      c = e & -e
+      while True:
+        c_ = (c | (c << 1) | (c >> 1) | (c << w) | (c >> w)) & e
+        if c_ == c: break
+        c = c_
+      if not (t >> bin(c).count("1")) & 1: return True
+      e ^= c
+    return False
+
+  return prune
+
+# set up the exact cover problem for fit() and count_fits()
+# return (<X>, <Y>, <syms>), or None if there are no solutions
+# <syms> is None, or (<symmetries>, <k>, <fixed>) (see: _break_symmetry())
+def _problem(ps, x, y, holes, unique, counts=None):
+
+  # check the dimensions of the pieces
+  assert not (sum(len(p[0]) * k for (p, k) in zip(ps, counts or [1] * len(ps))) + len(holes) > x * y), "Impossible!"
+
+  # set up the matrix for algorithm X
+  Y = _matrix(ps, x, y, holes)
+  if Y is None: return
+  (n, xy) = (len(ps), x * y)
+
+  # break any symmetry
+  syms = None
+  ts = (_symmetries(ps, x, y, holes) if unique else None)
+  if ts:
+    (Y, k, fixed) = _break_symmetry(Y, ts, n, xy, counts)
+    syms = (ts, k, fixed)
+
+  X = _columns(Y, n + xy + bool(holes))
+  return (X, Y, syms)
+
+# relabel grid <g> so that the copies of each piece are labelled in
+# order of their first appearance (<fs> maps the label of each copy to
+# the first label of the piece)
+def _relabel(g, fs):
+  (d, ns) = (dict(), dict())
+  h = list()
+  for v in g:
+    w = d.get(v)
+    if w is None:
+      f = fs.get(v)
+      if f is None:
+        w = v
+      else:
+        w = ns.get(f, f)
+        ns[f] = w + 1
+      d[v] = w
+    h.append(w)
+  return h
+
+# generate solution grids (as linear lists) for exact covers of <X>, <Y>
+# (using the DLX engine with prune function <prune>, or for pieces with
+# <counts>, if specified)
+def _solutions(X, Y, syms, n, xy, engine, prune=None, counts=None):
+  if syms: (ts, k, fixed) = syms
+  seen = set()
+  if prune is None and counts is None:
+    rss = engines[engine](X, Y, list())
+  else:
+    rss = dlx.algorithmX(X, Y, list(), prune=prune, mult=_mult(counts, xy))
+  if counts:
+    # map the label of each copy of a piece to the first label of the piece
+    fs = dict()
+    for (v, c) in zip(_piece_labels(n, counts), counts):
+      fs.update((v + j, v) for j in range(c))
+  for g in _grids(Y, rss, n, xy, counts):
+    if syms and (k is None or (fixed and tuple(i for (i, v) in enumerate(g) if v == k) in fixed)):
+      # remove duplicate solutions
+      gs = [g]
+      for t in ts:
+        h = [None] * xy
+        for (i, v) in enumerate(g): h[t[i]] = v
+        gs.append(h)
+      if counts: gs = list(_relabel(h, fs) for h in gs)
+      h = tuple(min(gs))
+      if h in seen: continue
+      seen.add(h)
+    yield g
+
+# fit pieces <ps> into an <x> x <y> grid, avoiding <holes>
+# (for boards that are not rectangles, see: fit_region())
+# (repeated pieces can be given as (<piece>, <count>) pairs)
+# <fn> is used to format the results (default is a list of rows)
+# <engine> selects the exact cover engine (see: engines)
+# <unique> only generates solutions that are different under the
+# symmetries of the board (see: _symmetries())
+# <limit> stops after that many solutions have been generated
+# <prune> abandons placements that leave regions that cannot be filled
+# (using the DLX engine, or a ValueError is raised for another <engine>,
+# see: _pruner())
+# (repeated pieces are always fitted using the DLX engine, whatever
+# <engine> is specified)
+def fit(ps, x, y, holes=set(), fn=None, engine=None, unique=0, limit=None, prune=0):
+  _check_prune(prune, engine)
+
+  # how to format the results
+  # each grid is calculated as a linear list
+  # default is to chunk it into rows
+  if fn is None: fn = lambda g: list(chunk(g, x))
+
+  (ps, counts) = _pieces(ps)
+  p = _problem(ps, x, y, holes, unique, counts)
+  if p is None: return
+  (X, Y, syms) = p
+  if prune: prune = _pruner(Y, ps, _squares(x, y), holes, counts)
+
+  # find exact covers using algorithm X
+  for g in islice(_solutions(X, Y, syms, len(ps), x * y, engine, prune or None, counts), limit):
+    yield fn(g)
+
+# the (x, y) squares of an <x> x <y> grid, in order of linear index
+def _squares(x, y):
+  return list((i, j) for j in range(y) for i in range(x))
+
+# unique solutions (without symmetry breaking):
+#
+# fit_unique() generates the solutions found by fit() that are different
+# under the symmetries of the board (the transformations of the grid that
+# map the holes to themselves), without restricting the placements of
+# any piece (so it can be used when symmetry cannot be broken upfront).
+# identical pieces are treated as the same piece.
+#
+# each solution is reduced to a canonical form (the smallest of its
+# transformations, with identical pieces relabelled in order of their
+# first appearance), and only a 64-bit digest of the canonical form is
+# remembered, so the memory used is proportional to the number of
+# different solutions.
+
+# fit pieces <ps> into an <x> x <y> grid, avoiding <holes>, generating
+# only solutions that are different under the symmetries of the board
+# (<fn>, <engine>, <limit> and <prune> are as for fit())
+def fit_unique(ps, x, y, holes=set(), fn=None, engine=None, limit=None, prune=0):
+  if fn is None: fn = lambda g: list(chunk(g, x))
+  if limit is not None and limit < 1: return
+
+  # the symmetries of the board (whatever the pieces are)
+  ts = _symmetries((), x, y, holes)
+
+  # identical pieces are relabelled from the same label
+  (qs, counts) = _pieces(ps)
+  counts = (counts or [1] * len(qs))
+  ks = dict()
+  for (p, c) in zip(qs, counts):
+    k = tuple(sorted(set(map(_normalise, p))))
+    ks[k] = ks.get(k, 0) + c
+  (bs, n) = (dict(), 1)
+  for (k, c) in ks.items():
+    bs[k] = n
+    n += c
+  fs = dict()
+  for (p, v, c) in zip(qs, _piece_labels(len(qs), counts), counts):
+    b = bs[tuple(sorted(set(map(_normalise, p))))]
+    fs.update((v + j, b) for j in range(c))
+
+  seen = set()
+  for g in fit(ps, x, y, holes, fn=(lambda g: g), engine=engine, prune=prune):
+    # find the canonical form of the solution
+    gs = [_relabel(g, fs)]
+    for t in ts:
+      h = [None] * (x * y)
+      for (i, v) in enumerate(g): h[t[i]] = v
+      gs.append(_relabel(h, fs))
+    z = arrays.digest(min(gs))
+    if z in seen: continue
+    seen.add(z)
+    yield fn(g)
+    if len(seen) == limit: break
+
+# exact cover counters: map <name> -> function(X, Y, limit)
+counters = {
+  None: (lambda X, Y, limit=None: sum(1 for _ in islice(algorithmX(X, Y, list()), limit))),
+  "dlx": dlx.algorithmX_count,
+}
+counters["X"] = counters[None]
+
+# count the solutions found by fit() (stopping after <limit> solutions)
+# the grids are not constructed (unless they are needed to remove
+# duplicate solutions when <unique> is set)
+def count_fits(ps, x, y, holes=set(), engine=None, unique=0, limit=None, prune=0):
+  _check_prune(prune, engine)
+  (ps, counts) = _pieces(ps)
+  p = _problem(ps, x, y, holes, unique, counts)
+  if p is None: return 0
+  (X, Y, syms) = p
+  if prune: prune = _pruner(Y, ps, _squares(x, y), holes, counts)
+  if syms and (syms[1] is None or syms[2]):
+    return sum(1 for _ in islice(_solutions(X, Y, syms, len(ps), x * y, engine, prune or None, counts), limit))
+  if prune or counts:
+    return dlx.algorithmX_count(X, Y, limit, prune=(prune or None), mult=_mult(counts, x * y))
+  return counters[engine](X, Y, limit)
+
+# fitting pieces into a region:
+#
+# the board is given as a collection of squares (which need not be
+# rectangular, or connected). the squares are numbered in order (by row,
+# then column), and placements of a piece are found by anchoring the
+# first square of each orientation on each square of the region (so only
+# the squares of the region are considered, not its bounding box).
+
+# generate placements for piece <p> in the region with squares <index>
+# (a map of <square> -> <number>)
+# return the numbers of the occupied squares
+def region_placements(p, index):
+  for q in p:
+    (ax, ay) = min(q, key=(lambda c: (c[1], c[0])))
+    for (x0, y0) in index.keys():
+      (dx, dy) = (x0 - ax, y0 - ay)
+      ss = list()
+      for (i, j) in q:
+        k = index.get((i + dx, j + dy))
+        if k is None: break
+        ss.append(k)
+      else:
+        yield ss
+
+# the non-identity symmetries of the region <squares> (with pieces <ps>),
+# as maps of square numbers
+def _region_symmetries(ps, squares):
+  fs = [
+    (lambda i, j: (-i, j)),
+    (lambda i, j: (i, -j)),
+    (lambda i, j: (-i, -j)),
+    (lambda i, j: (j, i)),
+    (lambda i, j: (-j, i)),
+    (lambda i, j: (j, -i)),
+    (lambda i, j: (-j, -i)),
+  ]
+  index = dict((c, k) for (k, c) in enumerate(squares))
+  (mx, my) = (min(i for (i, j) in squares), min(j for (i, j) in squares))
+  ts = list()
+  for f in fs:
+    # the region must map to itself (after translation)
+    vs = list(f(i, j) for (i, j) in squares)
+    (dx, dy) = (mx - min(i for (i, j) in vs), my - min(j for (i, j) in vs))
+    t = list(index.get((i + dx, j + dy)) for (i, j) in vs)
+    if None in t: continue
+    # and the orientations of each piece must map to orientations of the piece
+    if not _preserves(f, ps): continue
+    ts.append(t)
+  return ts
+
+# fit pieces <ps> into the region <squares> (a collection of (x, y) squares)
+# <fn> is used to format the results (default is a map of (x, y) -> label)
+# <engine>, <unique>, <limit> and <prune> are as for fit()
+def fit_region(ps, squares, fn=None, engine=None, unique=0, limit=None, prune=0):
+  _check_prune(prune, engine)
+  (ps, counts) = _pieces(ps)
+  squares = sorted(set(squares), key=(lambda c: (c[1], c[0])))
+  (n, xy) = (len(ps), len(squares))
+
+  # check the dimensions of the pieces
+  assert sum(len(p[0]) * k for (p, k) in zip(ps, counts or [1] * n)) == xy, "Impossible!"
+
+  # how to format the results
+  # each grid is calculated as a list (in the order of <squares>)
+  # default is a map of squares to piece labels
+  if fn is None: fn = lambda g: dict(zip(squares, g))
+
+  # set up the matrix for algorithm X
+  index = dict((c, k) for (k, c) in enumerate(squares))
+  Y = list()
+  for (i, p) in enumerate(ps, start=xy):
+    k = len(Y)
+    for ss in region_placements(p, index):
+      ss.append(i)
+      Y.append(ss)
+    if len(Y) == k: return
+
+  # break any symmetry
+  syms = None
+  ts = (_region_symmetries(ps, squares) if unique else None)
+  if ts:
+    (Y, k, fixed) = _break_symmetry(Y, ts, n, xy, counts)
+    syms = (ts, k, fixed)
+
+  # find exact covers using algorithm X
+  X = _columns(Y, n + xy)
+  prune = (_pruner(Y, ps, squares, (), counts) if prune else None)
+  for g in islice(_solutions(X, Y, syms, n, xy, engine, prune, counts), limit):
     yield fn(g)
 
+# parallel fitting:
+#
+# the exact cover search is split on the rows of a column with the fewest
+# rows (once any forced rows have been applied, see: _split()), and
+# each subproblem is solved by a pool of worker processes. each worker
+# rebuilds the matrix with the other rows of that column removed, and
+# returns the grids it finds (which are formatted using <fn> in the
+# calling process).
+
+def _fit_task(args):
+  (ps, counts, x, y, holes, c, r, engine) = args
+  Y = _matrix(ps, x, y, holes)
+  (n, xy) = (len(ps), x * y)
+  # remove the other rows that cover column c
+  Y = list(v for (i, v) in enumerate(Y) if i == r or c not in v)
+  X = _columns(Y, n + xy + bool(holes))
+  if counts is None:
+    rss = engines[engine](X, Y, list())
+  else:
+    rss = dlx.algorithmX(X, Y, list(), mult=_mult(counts, xy))
+  return list(_grids(Y, rss, n, xy, counts))
+
+# choose a column of the matrix <X>, <Y> to split the search on (one
+# that is only covered once, so not in <m>)
+#
+# the forced rows (the only row in a column) are applied first, then the
+# column with the fewest remaining rows (but more than one) is chosen
+# return (<column>, <rows>), or (None, None) if there are no exact covers
+def _split(X, Y, m):
+  Z = dict((k, set(v)) for (k, v) in X.items())
+  while True:
+    ks = list(k for (k, v) in Z.items() if k not in m and len(v) < 2)
+    if not ks: break
+    for k in ks:
+      v = Z.get(k)
+      if v is None: continue
+      if not v: return (None, None)
+      # select the forced row (removing the rows that intersect it)
+      (r,) = v
+      for c in Y[r]:
+        if c in m:
+          Z[c].discard(r)
+          continue
+        for i in Z.pop(c):
+          for j in Y[i]:
+            if j != c and j in Z: Z[j].discard(i)
+  ks = list(k for k in Z.keys() if k not in m)
+  if ks:
+    c = min(ks, key=(lambda k: len(Z[k])))
+    return (c, sorted(Z[c]))
+  # otherwise everything is forced, so split on any column
+  c = min((k for k in X.keys() if k not in m), key=(lambda k: len(X[k])))
+  return (c, sorted(X[c]))
+
+# fit pieces <ps> into an <x> x <y> grid, avoiding <holes>, using a pool
+# of <workers> processes (default = number of CPUs). if <ordered> is set
+# the grids are generated in a deterministic order (by subproblem),
+# otherwise they are generated as they arrive from the workers.
+def fit_parallel(ps, x, y, holes=set(), fn=None, workers=None, ordered=0, engine=None):
+  import multiprocessing
+
+  # check the dimensions of the pieces
+  (ps, counts) = _pieces(ps)
+  assert not (sum(len(p[0]) * k for (p, k) in zip(ps, counts or [1] * len(ps))) + len(holes) > x * y), "Impossible!"
+  if fn is None: fn = lambda g: list(chunk(g, x))
+
+  # choose the column to split on
+  Y = _matrix(ps, x, y, holes)
+  if Y is None: return
+  X = _columns(Y, len(ps) + x * y + bool(holes))
+  (c, rs) = _split(X, Y, (_mult(counts, x * y) or dict()))
+  if c is None: return
+
+  # distribute the subproblems to the workers
+  ps = list(list(list(q) for q in p) for p in ps)
+  ts = ((ps, counts, x, y, holes, c, r, engine) for r in rs)
+  pool = multiprocessing.Pool(workers)
+  try:
+    for gs in (pool.imap if ordered else pool.imap_unordered)(_fit_task, ts):
+      for g in gs: yield fn(g)
+    pool.close()
+  finally:
+    pool.terminate()
+    pool.join()
+
 # pack rectangles into a grid
-def rectpack(rs, x, y, holes=set(), fn=None):
+# (each rectangle is labelled with its position in <rs> (from 1))
+#
+# identical rectangles are fitted as repeated pieces (using the DLX
+# engine), unless a different <engine> is specified
+def rectpack(rs, x, y, holes=set(), fn=None, engine=None):
+  if fn is None: fn = lambda g: list(chunk(g, x))
+
+  # collect identical rectangles (in order of first appearance)
+  group = (engine is None or engine == "dlx")
+  d = OrderedDict()
+  for (i, (a, b)) in enumerate(rs, start=1):
+    k = ((min(a, b), max(a, b)) if group else i)
+    if k in d:
+      d[k][1].append(i)
+    else:
+      d[k] = [(a, b), [i]]
 
   # turn the rectangles into shapes (in both orientations)
-  ps = list()
-  for (a, b) in rs:
+  (ps, ls) = (list(), dict())
+  for ((a, b), js) in d.values():
     p = list()
     p.append(list((i, j) for i in range(a) for j in range(b)))
     if a != b: p.append(list((j, i) for i in range(a) for j in range(b)))
-    ps.append(p)
+    # copies of a piece are labelled consecutively, so map them back to
+    # the positions of the rectangles
+    ls.update((len(ls) + 1, j) for j in js)
+    ps.append((p, len(js)) if len(js) > 1 else p)
 
   # attempt to fit the shapes into a square
-  for g in fit(ps, x, y, holes, fn):
-    yield g
-
+  for g in fit(ps, x, y, holes, (lambda g: g), engine=engine):
+    yield fn(list(ls.get(v, v) for v in g))
 
 # output a grid
 _labels = "-123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
@@ -329,13 +1214,43 @@ def output_grid(g, reverse=1, label=_labels, sep=" ", end=""):
     printf("[ {r} ]", r=join((label[x] for x in r), sep=sep))
   if end is not None: printf("{end}")
 
-# compute the polyominoes
-populate([1, 2, 3, 4, 5]) # 6 (hexominoes) are optional
-
 if enigma._namecheck(__name__):
 
   r = arg("D", 0)
 
+  if r == "I":
+    # measure the time taken to import this module (in new processes)
+    import os
+    import subprocess
+    import sys
+    from timeit import default_timer as timer
+    N = arg(20, 1, int)
+    printf("[I] import time (average of {N} processes)\n")
+    d = os.path.dirname(os.path.abspath(__file__))
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(x for x in [d, env.get("PYTHONPATH")] if x)
+    for stmt in ["import enigma", "import polyominoes", "import polyominoes; polyominoes.populate([1, 2, 3, 4, 5])"]:
+      t0 = timer()
+      for _ in range(N):
+        subprocess.check_call([sys.executable, "-c", stmt], env=env)
+      t1 = timer()
+      printf("  {stmt!r}: {t:.1f}ms", t=1000 * (t1 - t0) / N)
+
+  if r == "H":
+    # compare the exact cover engines on the pentomino demos (D and E)
+    from timeit import default_timer as timer
+    es = args(["X", "dlx"], 1)
+    printf("[H] exact cover engines: {es}\n", es=join(es, sep=" "))
+    ps = shapes("F5 I5 L5 N5 P5 T5 U5 V5 W5 X5 Y5 Z5")
+    ps[7] = ps[7][:1] # remove duplicates by fixing the orientation of V5
+    for (x, y, holes) in [(10, 6, []), (12, 5, []), (8, 8, [(3, 3), (3, 4), (4, 3), (4, 4)])]:
+      printf("[{x}x{y} grid; {h} holes]", h=len(holes))
+      for e in es:
+        t0 = timer()
+        n = sum(1 for _ in fit(ps, x, y, holes, engine=e))
+        t1 = timer()
+        printf("  engine={e}: {n} solutions; {t:.3f}s", t=t1 - t0)
+
   if r == "G":
     vs = args(["*"], 1)
 
@@ -372,6 +1287,14 @@ if enigma._namecheck(__name__):
       g.display(pre="  ", start="", end="\n")
 
 
+  if r == "N":
+    ks = args([7, 8], 1, int)
+    printf("[N] generated polyominoes: orders {ks}\n", ks=join(ks, sep=" "))
+    for k in ks:
+      d = generated(k)
+      n = sum(1 for x in d.keys() if not x.endswith("'"))
+      printf("order {k}: {n} free polyominoes; {m} one sided polyominoes", m=len(d))
+
   if r == "F":
     vs = args(["F5"], 1)
     printf("# [F] compute shape data: {vs}\n", vs=join(vs, sep=" "))
@@ -388,8 +1311,9 @@ if enigma._namecheck(__name__):
     # (129168 solutions if O4 is added and the hole removed)
     ps = shapes("F5 I5 L5 N5 P5 T5 U5 V5 W5 X5 Y5 Z5")
     ps[0] = ps[0][:1] # remove duplicates by fixing the orientation of F5
+    engine = arg(None, 1)
     n = 0
-    for g in fit(ps, 8, 8, [(3, 3), (3, 4), (4, 3), (4, 4)]):
+    for g in fit(ps, 8, 8, [(3, 3), (3, 4), (4, 3), (4, 4)], engine=engine):
       output_grid(g)
       n += 1
     printf("[{n} solutions]")
@@ -406,8 +1330,47 @@ if enigma._namecheck(__name__):
     # 6x10 = 9356 solutions [2339 different]
     ps = shapes("F5 I5 L5 N5 P5 T5 U5 V5 W5 X5 Y5 Z5")
     ps[7] = ps[7][:1] # remove duplicates by fixing the orientation of V5
+    engine = arg(None, 3)
+    n = 0
+    for g in fit(ps, x, y, engine=engine):
+      output_grid(g)
+      n += 1
+    printf("[{n} solutions]")
+
+  if r == "P":
+    x = arg(10, 1, int)
+    y = arg(6, 2, int)
+    workers = arg(None, 3, int)
+    printf("[P] pentominoes into {x}x{y} rectangle (in parallel)\n")
+    # as D, but using a pool of worker processes
+    ps = shapes("F5 I5 L5 N5 P5 T5 U5 V5 W5 X5 Y5 Z5")
+    ps[7] = ps[7][:1] # remove duplicates by fixing the orientation of V5
+    n = 0
+    for g in fit_parallel(ps, x, y, workers=workers, engine="dlx"):
+      output_grid(g)
+      n += 1
+    printf("[{n} solutions]")
+
+  if r == "R":
+    # pentominoes into an 8x8 grid with the corners removed
+    printf("[R] pentominoes into an 8x8 grid with the corners removed\n")
+    ps = shapes("F5 I5 L5 N5 P5 T5 U5 V5 W5 X5 Y5 Z5")
+    corners = set([(0, 0), (0, 7), (7, 0), (7, 7)])
+    region = set((x, y) for x in range(8) for y in range(8)).difference(corners)
+    engine = arg("dlx", 1)
+    n = 0
+    for g in fit_region(ps, region, engine=engine, unique=1):
+      output_grid(list(list(g.get((x, y), 0) for x in range(8)) for y in range(8)))
+      n += 1
+    printf("[{n} solutions]")
+
+  if r == "U":
+    # one sided shapes in a 5x5 grid, with unique solutions found by fit_unique()
+    ns = args("I2 I3 O4 I4 S4 L4 R4".split(), 1)
+    printf("[U] one sided shapes in a 5x5 grid (unique solutions): {ns}\n", ns=join(ns, sep=" "))
+    ps = shapes(ns, "ONE_SIDED")
     n = 0
-    for g in fit(ps, x, y):
+    for g in fit_unique(ps, 5, 5, engine="dlx"):
       output_grid(g)
       n += 1
     printf("[{n} solutions]")
@@ -416,7 +1379,7 @@ if enigma._namecheck(__name__):
     # 5x V3s in a 4x4 grid with 1 hole
     printf("[C] 5x V3 in a 4x4 grid with 1 hole\n")
     (O1, V3) = shapes("O1 V3")
-    for g in fit([V3] * 5, 4, 4, holes=[(0, 2)]):
+    for g in fit([(V3, 5)], 4, 4, holes=[(0, 2)]):
       output_grid(g)
 
   if r == "B":
@@ -12,12 +12,16 @@
 
 from __future__ import print_function
 
+from array import array
+
 from enigma import (
-  module, irange, multiset, ordered, unpack, uniq, join, printf
+  module, irange, multiset, ordered, unpack, uniq, peek, join, printf, basestring
 )
 
+import arrays
+
 __author__ = "Jim Randell <jim.randell@gmail.com>"
-__version__ = "2025-07-01"
+__version__ = "2026-10-16"
 
 rectpack = module(__name__)
 
@@ -57,7 +61,8 @@ def overlap(r, ps):
 # n, m = the dimensions of the grid
 # rs = dimensions of the rectangles [(w, h), ...]
 # (ps = positions of the rectangles [(x, y, w, h), ...])
-def pack_loose(n, m, rs, ps=[]):
+# accept = function to accept/reject placements (x, y, w, h) (optional)
+def pack_loose(n, m, rs, ps=[], accept=None):
   # are we done?
   if not rs:
     yield ps
@@ -83,7 +88,8 @@ def pack_loose(n, m, rs, ps=[]):
         k = overlap(r, ps)
         if k == -1:
           # try to place the remaining rectangles
-          for z in pack_loose(n, m, rs[1:], ps + [r]): yield z
+          if accept is None or accept(r):
+            for z in pack_loose(n, m, rs[1:], ps + [r], accept): yield z
           i += 1
         else:
           (x, y, w, h) = ps[k]
@@ -106,64 +112,606 @@ def empty(n, m, ps, i=0, j=0):
 # rs = dimensions of the rectangles [(w, h), ...]
 # ps = positions of the rectangles [(x, y, w, h), ...]
 # i, j = position to start looking for empty squares
-def pack_tight(n, m, rs, ps=[], i=0, j=0):
+# accept = function to accept/reject placements (x, y, w, h) (optional)
+# prune = function to reject partial packings (optional, see prune_all())
+def pack_tight(n, m, rs, ps=[], i=0, j=0, accept=None, prune=None):
   # are we done?
   if not rs:
     yield ps
   else:
     # find an empty square
     (i, j) = empty(n, m, ps, i, j)
+    # check the remaining rectangles can still be placed
+    if prune and prune(n, m, rows(n, m, ps), rs, i, j): return
     # fit one of the remaining rectangles there
     for (k, r) in enumerate(rs):
       pq = {r, r[::-1]}
       for (p, q) in pq:
         if not (i + p > n or j + q > m or (k and rs[k - 1] in pq)):
           r = (i, j, p, q)
-          if overlap(r, ps) == -1:
+          if overlap(r, ps) == -1 and (accept is None or accept(r)):
             # and try to place the remaining rectangles
-            for z in pack_tight(n, m, rs[:k] + rs[k + 1:], ps + [r], i + p, j): yield z
+            for z in pack_tight(n, m, rs[:k] + rs[k + 1:], ps + [r], i + p, j, accept, prune): yield z
 
 # pack rectangles with repeated shapes
 # n, m = dimensions of grid
 # rs = different rectangle shapes (and order)
 # qs = multiset of quantities
-def _mpack_tight(n, m, rs, qs, ps=[], i=0, j=0):
+def _mpack_tight(n, m, rs, qs, ps=[], i=0, j=0, accept=None, prune=None):
   # are we done?
   if not qs:
     yield ps
   else:
     # find an empty square
     (i, j) = empty(n, m, ps, i, j)
+    # check the remaining rectangles can still be placed
+    if prune and prune(n, m, rows(n, m, ps), expand(qs), i, j): return
     # fit one of the remaining rectangles there
     for (k, r) in enumerate(rs):
       for (p, q) in {r, r[::-1]}:
         if not (i + p > n or j + q > m):
           x = (i, j, p, q)
-          if overlap(x, ps) == -1:
+          if overlap(x, ps) == -1 and (accept is None or accept(x)):
             # try to place the remaining rectangles
             qs_ = qs.copy().remove(r)
             rs_ = (rs if r in qs_ else rs[:k] + rs[k + 1:])
-            for z in _mpack_tight(n, m, rs_, qs_, ps + [x], i + p, j): yield z
+            for z in _mpack_tight(n, m, rs_, qs_, ps + [x], i + p, j, accept, prune): yield z
 
-# pack rectangles with repeated shapes
-def mpack_tight(n, m, rs, ps=[], i=0, j=0):
-  # collect rectangles by shape
+# collect rectangles by shape
+# return (<shapes (in order)>, <multiset of shapes>)
+def collect(rs):
   (ks, qs) = (list(), multiset())
   for r in rs:
     r = normalise(r)
     qs.add(r)
     if not (ks and ks[-1] == r): ks.append(r)
-  return _mpack_tight(n, m, ks, qs, ps, i, j)
+  return (ks, qs)
 
-def pack(n, m, rs, packer=pack_tight, order=by_area, ps=None):
-  # do some quick checks to look for impossible scenarios
+# expand a (multi)set of shapes (as a dict of counts) into a list
+def expand(qs):
+  return list(r for (r, k) in qs.items() for _ in range(k))
+
+# pack rectangles with repeated shapes
+def mpack_tight(n, m, rs, ps=[], i=0, j=0, accept=None, prune=None):
+  (ks, qs) = collect(rs)
+  return _mpack_tight(n, m, ks, qs, ps, i, j, accept, prune)
+
+# bitboard packers:
+#
+# these generate the same packings (in the same order) as the
+# corresponding packers above, but the occupancy of the grid is
+# maintained as a list of integer row masks (bit <i> of row <j> is set
+# if square (i, j) is occupied), so overlap tests and searching for
+# empty squares are done with bit operations, rather than by scanning
+# the list of placed rectangles
+
+# row masks for an <n> x <m> grid containing rectangles <ps>
+def rows(n, m, ps=()):
+  g = [0] * m
+  for (x, y, p, q) in ps:
+    b = ((1 << p) - 1) << x
+    for j in range(y, y + q): g[j] |= b
+  return g
+
+# OR together <u> shifted right by 0 .. p - 1 places
+# (bit i of the result is set if any of bits i .. i + p - 1 of <u> are)
+def _smear(u, p):
+  (v, k) = (u, 1)
+  while 2 * k <= p:
+    v |= v >> k
+    k *= 2
+  if k < p: v |= v >> (p - k)
+  return v
+
+# find the first empty square in row masks <g>, starting at (i, j)
+def empty_bits(n, m, g, i=0, j=0):
+  if i >= n:
+    j += i // n
+    i %= n
+  full = (1 << n) - 1
+  while j < m:
+    b = (full ^ g[j]) >> i << i
+    if b: return ((b & -b).bit_length() - 1, j)
+    (i, j) = (0, j + 1)
+
+# bitboard version of pack_loose()
+def pack_loose_bits(n, m, rs, ps=[], accept=None):
+  return _pack_loose_bits(n, m, rs, ps, rows(n, m, ps), accept)
+
+def _pack_loose_bits(n, m, rs, ps, g, accept):
+  # are we done?
+  if not rs:
+    yield ps
+  else:
+    # try to fit the next rectangle into the grid
+    r = rs[0]
+    pq = {r, r[::-1]}
+    ij = (0, 0)
+    if ps:
+      # if we are a duplicate rectangle start from previous position
+      (i, j, p, q) = ps[-1]
+      if (p, q) in pq: ij = (i + p, j)
+    for (p, q) in pq:
+      (i, j) = ij
+      b = (1 << p) - 1
+      while True:
+        if i + p > n:
+          i = 0
+          j += 1
+        if j + q > m: break
+        # find the positions in this row where the rectangle fits
+        u = 0
+        for y in range(j, j + q): u |= g[y]
+        f = ~_smear(u, p) & ((1 << (n - p + 1)) - 1) >> i << i
+        while f:
+          i = (f & -f).bit_length() - 1
+          f &= f - 1
+          if accept and not accept((i, j, p, q)): continue
+          # place the rectangle, and try to place the remaining rectangles
+          x = b << i
+          for y in range(j, j + q): g[y] |= x
+          for z in _pack_loose_bits(n, m, rs[1:], ps + [(i, j, p, q)], g, accept): yield z
+          for y in range(j, j + q): g[y] ^= x
+        i = n
+
+# bitboard version of pack_tight()
+def pack_tight_bits(n, m, rs, ps=[], i=0, j=0, accept=None, prune=None):
+  return _pack_tight_bits(n, m, rs, ps, rows(n, m, ps), i, j, accept, prune)
+
+def _pack_tight_bits(n, m, rs, ps, g, i, j, accept, prune):
+  # are we done?
+  if not rs:
+    yield ps
+  else:
+    # find an empty square
+    ij = empty_bits(n, m, g, i, j)
+    if ij is None: return
+    (i, j) = ij
+    # check the remaining rectangles can still be placed
+    if prune and prune(n, m, g, rs, i, j): return
+    # fit one of the remaining rectangles there
+    for (k, r) in enumerate(rs):
+      pq = {r, r[::-1]}
+      for (p, q) in pq:
+        if not (i + p > n or j + q > m or (k and rs[k - 1] in pq)):
+          if accept and not accept((i, j, p, q)): continue
+          b = ((1 << p) - 1) << i
+          for y in range(j, j + q):
+            if g[y] & b: break
+          else:
+            # place the rectangle, and try to place the remaining rectangles
+            for y in range(j, j + q): g[y] |= b
+            for z in _pack_tight_bits(n, m, rs[:k] + rs[k + 1:], ps + [(i, j, p, q)], g, i + p, j, accept, prune): yield z
+            for y in range(j, j + q): g[y] ^= b
+
+# bitboard version of mpack_tight()
+def mpack_tight_bits(n, m, rs, ps=[], i=0, j=0, accept=None, prune=None):
+  (ks, qs) = collect(rs)
+  return _mpack_tight_bits(n, m, ks, qs, ps, rows(n, m, ps), i, j, accept, prune)
+
+def _mpack_tight_bits(n, m, rs, qs, ps, g, i, j, accept, prune):
+  # are we done?
+  if not qs:
+    yield ps
+  else:
+    # find an empty square
+    ij = empty_bits(n, m, g, i, j)
+    if ij is None: return
+    (i, j) = ij
+    # check the remaining rectangles can still be placed
+    if prune and prune(n, m, g, expand(qs), i, j): return
+    # fit one of the remaining rectangles there
+    for (k, r) in enumerate(rs):
+      for (p, q) in {r, r[::-1]}:
+        if not (i + p > n or j + q > m):
+          if accept and not accept((i, j, p, q)): continue
+          b = ((1 << p) - 1) << i
+          for y in range(j, j + q):
+            if g[y] & b: break
+          else:
+            # place the rectangle, and try to place the remaining rectangles
+            qs_ = qs.copy().remove(r)
+            rs_ = (rs if r in qs_ else rs[:k] + rs[k + 1:])
+            for y in range(j, j + q): g[y] |= b
+            for z in _mpack_tight_bits(n, m, rs_, qs_, ps + [(i, j, p, q)], g, i + p, j, accept, prune): yield z
+            for y in range(j, j + q): g[y] ^= b
+
+# in-place packers:
+#
+# these are versions of the bitboard packers that maintain a single
+# working state (the row masks, the list of placed rectangles and the
+# rectangles remaining), which is updated as rectangles are placed, and
+# restored as they are removed, rather than copying it at each step.
+#
+# the packings are generated in the same order as the corresponding
+# packers above, but each packing is returned as a tuple (a snapshot of
+# the working state)
+
+# in-place version of pack_loose()
+def pack_loose_ip(n, m, rs, ps=[], accept=None):
+  ps = list(ps)
+  return _pack_loose_ip(n, m, rs, 0, ps, rows(n, m, ps), accept)
+
+# d = index of the next rectangle in <rs> to place
+def _pack_loose_ip(n, m, rs, d, ps, g, accept):
+  # are we done?
+  if d == len(rs):
+    yield tuple(ps)
+  else:
+    # try to fit the next rectangle into the grid
+    r = rs[d]
+    pq = {r, r[::-1]}
+    ij = (0, 0)
+    if ps:
+      # if we are a duplicate rectangle start from previous position
+      (i, j, p, q) = ps[-1]
+      if (p, q) in pq: ij = (i + p, j)
+    for (p, q) in pq:
+      (i, j) = ij
+      b = (1 << p) - 1
+      while True:
+        if i + p > n:
+          i = 0
+          j += 1
+        if j + q > m: break
+        # find the positions in this row where the rectangle fits
+        u = 0
+        for y in range(j, j + q): u |= g[y]
+        f = ~_smear(u, p) & ((1 << (n - p + 1)) - 1) >> i << i
+        while f:
+          i = (f & -f).bit_length() - 1
+          f &= f - 1
+          if accept and not accept((i, j, p, q)): continue
+          # place the rectangle, and try to place the remaining rectangles
+          x = b << i
+          for y in range(j, j + q): g[y] |= x
+          ps.append((i, j, p, q))
+          for z in _pack_loose_ip(n, m, rs, d + 1, ps, g, accept): yield z
+          ps.pop()
+          for y in range(j, j + q): g[y] ^= x
+        i = n
+
+# in-place version of pack_tight()
+def pack_tight_ip(n, m, rs, ps=[], i=0, j=0, accept=None, prune=None):
+  ps = list(ps)
+  # the orientations of each rectangle
+  os = dict((r, tuple({r, r[::-1]})) for r in rs)
+  return _pack_tight_ip(n, m, list(rs), os, ps, rows(n, m, ps), i, j, accept, prune)
+
+# rs = the remaining rectangles (a rectangle is removed from the list
+# while it is placed, and the list is also passed to <prune>)
+# os = map of rectangle -> orientations
+def _pack_tight_ip(n, m, rs, os, ps, g, i, j, accept, prune):
+  # are we done?
+  if not rs:
+    yield tuple(ps)
+  else:
+    # find an empty square
+    ij = empty_bits(n, m, g, i, j)
+    if ij is None: return
+    (i, j) = ij
+    # check the remaining rectangles can still be placed
+    if prune and prune(n, m, g, rs, i, j): return
+    # fit one of the remaining rectangles there
+    r0 = None
+    for k in range(len(rs)):
+      r = rs[k]
+      pq = os[r]
+      # skip duplicates of the previous remaining rectangle
+      if r0 in pq:
+        r0 = r
+        continue
+      r0 = r
+      for (p, q) in pq:
+        if not (i + p > n or j + q > m):
+          if accept and not accept((i, j, p, q)): continue
+          b = ((1 << p) - 1) << i
+          for y in range(j, j + q):
+            if g[y] & b: break
+          else:
+            # place the rectangle, and try to place the remaining rectangles
+            for y in range(j, j + q): g[y] |= b
+            del rs[k]
+            ps.append((i, j, p, q))
+            for z in _pack_tight_ip(n, m, rs, os, ps, g, i + p, j, accept, prune): yield z
+            ps.pop()
+            rs.insert(k, r)
+            for y in range(j, j + q): g[y] ^= b
+
+# in-place version of mpack_tight()
+def mpack_tight_ip(n, m, rs, ps=[], i=0, j=0, accept=None, prune=None):
+  (ks, qs) = collect(rs)
+  # count the rectangles of each shape
+  cs = dict()
+  for r in map(normalise, rs): cs[r] = cs.get(r, 0) + 1
+  ps = list(ps)
+  return _mpack_tight_ip(n, m, ks, cs, len(rs), ps, rows(n, m, ps), i, j, accept, prune)
+
+# cs = counts of the remaining rectangles (by shape)
+# t = the number of rectangles remaining
+def _mpack_tight_ip(n, m, rs, cs, t, ps, g, i, j, accept, prune):
+  # are we done?
+  if t == 0:
+    yield tuple(ps)
+  else:
+    # find an empty square
+    ij = empty_bits(n, m, g, i, j)
+    if ij is None: return
+    (i, j) = ij
+    # check the remaining rectangles can still be placed
+    if prune and prune(n, m, g, expand(cs), i, j): return
+    # fit one of the remaining rectangles there
+    for r in rs:
+      if not cs[r]: continue
+      for (p, q) in {r, r[::-1]}:
+        if not (i + p > n or j + q > m):
+          if accept and not accept((i, j, p, q)): continue
+          b = ((1 << p) - 1) << i
+          for y in range(j, j + q):
+            if g[y] & b: break
+          else:
+            # place the rectangle, and try to place the remaining rectangles
+            for y in range(j, j + q): g[y] |= b
+            cs[r] -= 1
+            ps.append((i, j, p, q))
+            for z in _mpack_tight_ip(n, m, rs, cs, t - 1, ps, g, i + p, j, accept, prune): yield z
+            ps.pop()
+            cs[r] += 1
+            for y in range(j, j + q): g[y] ^= b
+
+# skyline packers:
+#
+# in a tight packing the squares in each column are filled from the top,
+# so the occupancy of the grid can be represented by the skyline formed
+# by the heights of the columns. this is maintained as a list of
+# segments (<x>, <width>, <height>) of adjacent columns with the same
+# height. the next empty square is at the start of the lowest segment,
+# and a rectangle fits there if it is no wider than the segment.
+#
+# these generate the same packings (in the same order) as pack_tight()
+# and mpack_tight(). any initial placed rectangles <ps> must form a
+# tight packing.
+
+# skyline segments for an <n> x <m> grid containing rectangles <ps>
+def skyline(n, m, ps=()):
+  g = rows(n, m, ps)
+  hs = list(next((y for y in range(m) if not (g[y] >> x) & 1), m) for x in range(n))
+  sk = list()
+  for (x, h) in enumerate(hs):
+    if sk and sk[-1][2] == h:
+      sk[-1] = (sk[-1][0], sk[-1][1] + 1, h)
+    else:
+      sk.append((x, 1, h))
+  return sk
+
+# find the lowest segment in skyline <sk>
+# return the index of the segment
+def _lowest(sk):
+  (k, h) = (0, sk[0][2])
+  for (i, s) in enumerate(sk):
+    if s[2] < h: (k, h) = (i, s[2])
+  return k
+
+# place a (p x q) rectangle at the start of segment <k> in skyline <sk>
+# return the new skyline
+def _place(sk, k, p, q):
+  (x, w, h) = sk[k]
+  (a, b) = (sk[:k], sk[k + 1:])
+  s = (x, p, h + q)
+  # merge with the segment to the left?
+  if a and a[-1][2] == h + q:
+    s = (a[-1][0], a[-1][1] + p, h + q)
+    a = a[:-1]
+  if w > p:
+    return a + [s, (x + p, w - p, h)] + b
+  # merge with the segment to the right?
+  if b and b[0][2] == h + q:
+    return a + [(s[0], s[1] + b[0][1], h + q)] + b[1:]
+  return a + [s] + b
+
+# skyline version of pack_tight()
+def pack_tight_skyline(n, m, rs, ps=[], accept=None):
+  return _pack_tight_skyline(n, m, rs, ps, skyline(n, m, ps), accept)
+
+def _pack_tight_skyline(n, m, rs, ps, sk, accept):
+  # are we done?
+  if not rs:
+    yield ps
+  else:
+    # find the lowest segment
+    k = _lowest(sk)
+    (i, w, j) = sk[k]
+    if j == m: return
+    # fit one of the remaining rectangles there
+    for (x, r) in enumerate(rs):
+      pq = {r, r[::-1]}
+      for (p, q) in pq:
+        if not (p > w or j + q > m or (x and rs[x - 1] in pq)):
+          r = (i, j, p, q)
+          if accept and not accept(r): continue
+          # and try to place the remaining rectangles
+          for z in _pack_tight_skyline(n, m, rs[:x] + rs[x + 1:], ps + [r], _place(sk, k, p, q), accept): yield z
+
+# skyline version of mpack_tight()
+def mpack_tight_skyline(n, m, rs, ps=[], accept=None):
+  (ks, qs) = collect(rs)
+  return _mpack_tight_skyline(n, m, ks, qs, ps, skyline(n, m, ps), accept)
+
+def _mpack_tight_skyline(n, m, rs, qs, ps, sk, accept):
+  # are we done?
+  if not qs:
+    yield ps
+  else:
+    # find the lowest segment
+    k = _lowest(sk)
+    (i, w, j) = sk[k]
+    if j == m: return
+    # fit one of the remaining rectangles there
+    for (x, r) in enumerate(rs):
+      for (p, q) in {r, r[::-1]}:
+        if not (p > w or j + q > m):
+          s = (i, j, p, q)
+          if accept and not accept(s): continue
+          # try to place the remaining rectangles
+          qs_ = qs.copy().remove(r)
+          rs_ = (rs if r in qs_ else rs[:x] + rs[x + 1:])
+          for z in _mpack_tight_skyline(n, m, rs_, qs_, ps + [s], _place(sk, k, p, q), accept): yield z
+
+# pruning functions:
+#
+# these are used by the tight packers to abandon partial packings that
+# cannot be completed. they are called as:
+#
+#   prune(n, m, g, rs, i, j)
+#
+# where <g> is the row masks of the grid, <rs> the remaining rectangles,
+# and (i, j) is the first empty square (all squares before it in the grid
+# are filled). they return True if the packing cannot be completed.
+#
+# as the rectangles need not fill the grid, the number of squares that
+# will remain empty (the slack) is taken into account.
+
+# number of set bits in <x>
+def bit_count(x): return bin(x).count('1')
+
+# squares in row mask <e> that are in a run of at least <d> set bits
+def _runs(e, d):
+  # bits that start a run of (at least) <d>
+  (w, k) = (e, 1)
+  while 2 * k <= d:
+    w &= w >> k
+    k *= 2
+  if k < d: w &= w >> (d - k)
+  # spread them over the run
+  (v, k) = (w, 1)
+  while 2 * k <= d:
+    v |= v << k
+    k *= 2
+  if k < d: v |= v << (d - k)
+  return v
+
+# empty squares that are in a horizontal or vertical gap that is
+# narrower than the smallest dimension of the remaining rectangles
+# cannot be filled, so they must be part of the slack
+def prune_dead(n, m, g, rs, i, j):
+  if not rs: return False
+  full = (1 << n) - 1
+  # rows before j are full
+  es = list(full ^ x for x in g[j:])
+  slack = sum(bit_count(e) for e in es) - sum(w * h for (w, h) in rs)
+  if slack < 0: return True
+  d = min(min(r) for r in rs)
+  if d == 1: return False
+  k = len(es)
+  # runs of empty squares in the rows
+  hs = list(_runs(e, d) for e in es)
+  # runs of empty squares in the columns
+  vs = list(0 for _ in es)
+  for y in range(k - d + 1):
+    w = es[y]
+    for t in range(1, d): w &= es[y + t]
+    for t in range(d): vs[y + t] |= w
+  dead = sum(bit_count(e & ~(h & v)) for (e, h, v) in zip(es, hs, vs))
+  return dead > slack
+
+# each remaining rectangle can contribute at most its larger dimension
+# to the empty squares in any row or column
+def prune_capacity(n, m, g, rs, i, j):
+  if not rs: return False
+  full = (1 << n) - 1
+  es = list(full ^ x for x in g[j:])
+  slack = sum(bit_count(e) for e in es) - sum(w * h for (w, h) in rs)
+  if slack < 0: return True
+  t = sum(max(r) for r in rs) + slack
+  # rows
+  if any(bit_count(e) > t for e in es): return True
+  # columns
+  cs = [0] * n
+  for e in es:
+    while e:
+      b = e & -e
+      cs[b.bit_length() - 1] += 1
+      e ^= b
+  return any(c > t for c in cs)
+
+# the skyline of a partial packing consists of the number of filled
+# squares at the top of each column. a "well" is a run of columns of the
+# same height, where the columns either side are higher (or are the edge
+# of the grid). the bottom row of a well can only be filled by
+# rectangles placed in that row, so (apart from the slack) it must be
+# exactly filled by the widths of some of the remaining rectangles
+def prune_skyline(n, m, g, rs, i, j):
+  if not rs: return False
+  full = (1 << n) - 1
+  slack = sum(bit_count(full ^ x) for x in g[j:]) - sum(w * h for (w, h) in rs)
+  if slack < 0: return True
+  # determine the skyline (rows before j are full)
+  hs = [m] * n
+  f = full
+  for y in range(j, m):
+    x = f & ~g[y]
+    while x:
+      b = x & -x
+      hs[b.bit_length() - 1] = y
+      x ^= b
+    f &= g[y]
+    if not f: break
+  # consider each well
+  x = 0
+  while x < n:
+    h = hs[x]
+    k = x + 1
+    while k < n and hs[k] == h: k += 1
+    if h < m and (x == 0 or hs[x - 1] > h) and (k == n or hs[k] > h):
+      # find the largest sum of widths that fits in the well
+      (L, d) = (k - x, m - h)
+      (S, M) = (1, (1 << L + 1) - 1)
+      for (p, q) in rs:
+        z = 0
+        if p <= L and q <= d: z |= S << p
+        if q <= L and p <= d: z |= S << q
+        S |= z & M
+      # any unfilled squares are part of the slack
+      slack -= L - (S.bit_length() - 1)
+      if slack < 0: return True
+    x = k
+  return False
+
+# combine pruning functions
+def prunes(*fns):
+  return (lambda n, m, g, rs, i, j: any(fn(n, m, g, rs, i, j) for fn in fns))
+
+# all the pruning functions (cheapest first)
+def prune_all(n, m, g, rs, i, j):
+  return prune_skyline(n, m, g, rs, i, j) or prune_capacity(n, m, g, rs, i, j) or prune_dead(n, m, g, rs, i, j)
+
+# do some quick checks to look for impossible scenarios
+# return False if the rectangles <rs> cannot be packed into an <n> x <m> grid
+def check(n, m, rs):
   # total area
-  if sum(w * h for (w, h) in rs) > n * m: return ()
+  if sum(w * h for (w, h) in rs) > n * m: return False
   # check all rectangles fit in the grid
   (dmin, dmax) = sorted([n, m])
-  if any(max(r) > dmax or min(r) > dmin for r in rs): return ()
+  if any(max(r) > dmax or min(r) > dmin for r in rs): return False
   # stack rectangles with min dimension > 1/2 min dimension of grid [suggested by Frits]
-  if sum(x for x in map(min, rs) if 2 * x > dmin) > dmax: return ()
+  if sum(x for x in map(min, rs) if 2 * x > dmin) > dmax: return False
+  return True
+
+# the packers that do not support <prune>
+_no_prune = {pack_loose, pack_loose_bits, pack_loose_ip, pack_tight_skyline, mpack_tight_skyline}
+
+# pack rectangles <rs> into an <n> x <m> grid
+# packer = the packing function to use (or its name), e.g.:
+#   pack_tight, pack_loose, mpack_tight (scan the placed rectangles)
+#   pack_tight_bits, pack_loose_bits, mpack_tight_bits (use bitboards)
+#   pack_tight_ip, pack_loose_ip, mpack_tight_ip (bitboards, updated in-place)
+#   pack_tight_skyline, mpack_tight_skyline (skyline, does not support <prune>)
+# prune = pruning function (or sequence of functions) for the tight packers
+# (a ValueError is raised if the packer does not support it)
+# any additional keyword arguments are passed to the packer
+def pack(n, m, rs, packer=pack_tight, order=by_area, ps=None, prune=None, **kw):
+  # do some quick checks to look for impossible scenarios
+  if not check(n, m, rs): return ()
   # order the rectangles (if required)
   if not callable(order): order = globals().get(order)
   if order: rs = order(rs)
@@ -171,7 +719,151 @@ def pack(n, m, rs, packer=pack_tight, order=by_area, ps=None):
   if not callable(packer): packer = globals().get(packer)
   # do the packing
   if ps is None: ps = list()
-  return packer(n, m, rs, ps=ps)
+  if prune:
+    if packer in _no_prune: raise ValueError("packer {p} does not support prune".format(p=packer.__name__))
+    # check the initial position can be completed
+    if not callable(prune): prune = prunes(*prune)
+    g = rows(n, m, ps)
+    ij = empty_bits(n, m, g)
+    if ij and prune(n, m, g, rs, *ij): return ()
+    kw['prune'] = prune
+  return packer(n, m, rs, ps=ps, **kw)
+
+# parallel packing:
+#
+# the search tree of the tight packers is split by placing the first
+# <depth> rectangles, and the resulting subproblems are solved by a pool
+# of worker processes. (any <prune> function(s) must be defined at the
+# top level of a module, so they can be sent to the workers).
+
+# split the search for tight packings into subproblems
+# generates (<remaining rectangles>, <placed rectangles>) in the order
+# pack_tight() would encounter them
+def split_tight(n, m, rs, ps=[], i=0, j=0, accept=None, prune=None, depth=1):
+  # are we done?
+  if depth == 0 or not rs:
+    yield (rs, ps)
+  else:
+    # find an empty square
+    (i, j) = empty(n, m, ps, i, j)
+    if prune and prune(n, m, rows(n, m, ps), rs, i, j): return
+    # fit one of the remaining rectangles there
+    for (k, r) in enumerate(rs):
+      pq = {r, r[::-1]}
+      for (p, q) in pq:
+        if not (i + p > n or j + q > m or (k and rs[k - 1] in pq)):
+          r = (i, j, p, q)
+          if overlap(r, ps) == -1 and (accept is None or accept(r)):
+            for z in split_tight(n, m, rs[:k] + rs[k + 1:], ps + [r], i + p, j, accept, prune, depth - 1): yield z
+
+# solve a subproblem (in a worker process)
+def _pack_task(args):
+  (n, m, rs, ps, packer, prune, count) = args
+  ss = pack(n, m, rs, packer=packer, order=None, ps=ps, prune=prune)
+  return (sum(1 for _ in ss) if count else list(ss))
+
+# distribute the subproblems to a pool of worker processes
+# and generate the results from each subproblem
+def _parallel(n, m, rs, workers, depth, ordered, packer, order, prune, count):
+  import multiprocessing
+  if not callable(packer): packer = globals().get(packer)
+  ts = pack(n, m, rs, packer=split_tight, order=order, prune=prune, depth=depth)
+  ts = ((n, m, rs_, ps_, packer, prune, count) for (rs_, ps_) in ts)
+  pool = multiprocessing.Pool(workers)
+  try:
+    for r in (pool.imap if ordered else pool.imap_unordered)(_pack_task, ts):
+      yield r
+    pool.close()
+  finally:
+    pool.terminate()
+    pool.join()
+
+# generate tight packings using a pool of <workers> processes (default =
+# number of CPUs). the search is split after <depth> rectangles have
+# been placed. if <ordered> is set the packings are generated in the same
+# order as the packer would produce them, otherwise they are generated as
+# they arrive from the workers.
+# packer = a tight packer (pack_tight, pack_tight_bits, pack_tight_ip)
+def pack_parallel(n, m, rs, workers=None, depth=2, ordered=0, packer=pack_tight, order=by_area, prune=None):
+  for ss in _parallel(n, m, rs, workers, depth, ordered, packer, order, prune, 0):
+    #yield from ss  # [Python 3]
+    for s in ss: yield s  # [Python 2]
+
+# count tight packings using a pool of <workers> processes
+# (without sending the packings back from the workers)
+def count_parallel(n, m, rs, workers=None, depth=2, packer=pack_tight, order=by_area, prune=None):
+  return sum(_parallel(n, m, rs, workers, depth, 0, packer, order, prune, 1))
+
+# count tight packings of rectangles <rs> in an <n> x <m> grid
+#
+# rectangles of the same shape are considered identical (so the count is
+# the number of packings generated by mpack_tight()). the packings are
+# not constructed, and partial packings that leave the grid in the same
+# state (the same occupied squares and the same remaining rectangles) are
+# only counted once.
+#
+# if <uniq> is set, symmetrically different packings are counted. when
+# the rectangles fill the grid this uses Burnside's lemma (the number of
+# packings fixed by each symmetry of the grid are counted), otherwise
+# the packings are generated by pack_uniq() and counted.
+def count_packings(n, m, rs, uniq=0):
+  if not check(n, m, rs): return 0
+  if uniq and sum(w * h for (w, h) in rs) != n * m:
+    return sum(1 for _ in pack_uniq(n, m, rs, sym=1))
+  (ks, qs) = collect(rs)
+  # remove any repeated shapes (rs may not be ordered)
+  ks = tuple(sorted(set(ks)))
+  cs = tuple(qs[k] for k in ks)
+  fs = [None] + (symmetries(n, m)[1:] if uniq else [])
+  t = sum(_count_tight(n, m, ks, cs, rows(n, m), f, dict()) for f in fs)
+  return t // len(fs)
+
+# count tight packings fixed by symmetry <f>
+# ks = shapes of the rectangles
+# cs = counts of the remaining rectangles of each shape
+# g = row masks of the grid
+# f = a symmetry of the grid (as a function on placed rectangles) (or None)
+# memo = counts of previously encountered states
+def _count_tight(n, m, ks, cs, g, f, memo):
+  # are we done?
+  if not any(cs): return 1
+  # find an empty square
+  ij = empty_bits(n, m, g)
+  if ij is None: return 0
+  (i, j) = ij
+  # have we been here before?
+  key = (tuple(g[j:]), cs)
+  t = memo.get(key)
+  if t is not None: return t
+  # fit one of the remaining rectangles there
+  t = 0
+  for (k, r) in enumerate(ks):
+    if not cs[k]: continue
+    for (p, q) in {r, r[::-1]}:
+      if i + p > n or j + q > m: continue
+      # we also need to place the images of the rectangle under the symmetry
+      xs = [(i, j, p, q)]
+      if f:
+        x = f(i, j, p, q)
+        while x != xs[0]:
+          xs.append(x)
+          x = f(*x)
+        if len(xs) > cs[k]: continue
+      # place the rectangles
+      bs = list()
+      for (x, y, a, b) in xs:
+        b = (((1 << a) - 1) << x, y, y + b)
+        if any(g[z] & b[0] for z in range(b[1], b[2])): break
+        for z in range(b[1], b[2]): g[z] |= b[0]
+        bs.append(b)
+      else:
+        # and count the packings of the remaining rectangles
+        t += _count_tight(n, m, ks, cs[:k] + (cs[k] - len(xs),) + cs[k + 1:], g, f, memo)
+      # remove the rectangles
+      for (b, y0, y1) in bs:
+        for z in range(y0, y1): g[z] ^= b
+  memo[key] = t
+  return t
 
 # reflect a solution about vertical / horizontal axis
 soln = lambda s: tuple(sorted(s))
@@ -197,13 +889,207 @@ def canonical(n, m, s):
     r3 = rotate(n, m, s3)
     return min(s0, s1, s2, s3, r0, r1, r2, r3)
 
+# the loose packers
+_loose = {pack_loose, pack_loose_bits, pack_loose_ip}
+
+# symmetries of an <n> x <m> grid, as functions on placed rectangles
+# (the first is the identity)
+def symmetries(n, m):
+  fs = [
+    (lambda x, y, w, h: (x, y, w, h)),
+    (lambda x, y, w, h: (n - x - w, y, w, h)),
+    (lambda x, y, w, h: (x, m - y - h, w, h)),
+    (lambda x, y, w, h: (n - x - w, m - y - h, w, h)),
+  ]
+  if n == m:
+    # a square grid can also be rotated
+    fs.extend((lambda x, y, w, h, f=f: f(m - y - h, x, h, w)) for f in fs[:4])
+  return fs
+
+# a set of 64-bit digests of (hashable) values, for removing duplicates
+# in bounded memory
+#
+# the digests are stored in an open addressing hash table of <size>
+# slots (8 bytes each), which is doubled in size when it becomes 3/4
+# full. if <path> is given the table is kept in a memory-mapped file
+# (which is overwritten, and needs Python 3), otherwise it is kept in
+# memory. when the table is grown the new table is filled directly from
+# the old one (in a separate file, <path> + ".tmp", which then replaces
+# <path>), so the digests are not all copied into memory.
+#
+# values are only remembered by their digests, so distinct values with
+# the same digest are considered the same. for n values the chance of
+# this happening is about n^2 / 2^65 (so about 1 in 30 million for a
+# million values).
+class DigestSet(object):
+
+  def __init__(self, size=1 << 16, path=None):
+    if path is not None and not hasattr(memoryview, 'cast'):
+      # [Python 2]
+      raise ValueError("DigestSet: a memory-mapped table (path=) needs Python 3")
+    self.path = path
+    self.n = 0
+    size = max(1 << (size - 1).bit_length(), 8)
+    (self.file, self.mmap, self.table) = self._alloc(size, path)
+    self.mask = size - 1
+
+  # allocate an empty table with <size> slots (in memory, or in the
+  # file <path>)
+  # return (<file>, <mmap>, <table>)
+  def _alloc(self, size, path=None):
+    if path is None:
+      try:
+        return (None, None, array('Q', [0]) * size)
+      except ValueError:
+        # [Python 2] (no 'Q' arrays)
+        return (None, None, [0] * size)
+    f = open(path, 'w+b')
+    f.truncate(8 * size)
+    return self._map(f, size)
+
+  # map the table of <size> slots in file <f>
+  # return (<file>, <mmap>, <table>)
+  def _map(self, f, size):
+    import mmap
+    m = mmap.mmap(f.fileno(), 8 * size)
+    return (f, m, memoryview(m).cast('Q'))
+
+  # release the memory-mapped file (if any)
+  def close(self):
+    if self.mmap is not None:
+      self.table.release()
+      self.mmap.close()
+      self.file.close()
+      (self.file, self.mmap) = (None, None)
+
+  # digest of value <x> (0 is used to mark an empty slot)
+  def digest(self, x):
+    return (arrays.digest(x) or 1)
+
+  # find the slot for digest <d>
+  def _slot(self, d):
+    (t, mask) = (self.table, self.mask)
+    k = d & mask
+    while True:
+      v = t[k]
+      if v == 0 or v == d: return k
+      k = (k + 1) & mask
+
+  def __len__(self):
+    return self.n
+
+  def __contains__(self, x):
+    d = self.digest(x)
+    return self.table[self._slot(d)] == d
+
+  def add(self, x):
+    d = self.digest(x)
+    k = self._slot(d)
+    if self.table[k] == d: return
+    self.table[k] = d
+    self.n += 1
+    if 4 * self.n > 3 * (self.mask + 1): self._grow()
+
+  # double the size of the table
+  def _grow(self):
+    size = 2 * (self.mask + 1)
+    mask = size - 1
+    path = (None if self.path is None else self.path + ".tmp")
+    (f, m, t) = self._alloc(size, path)
+    # insert the digests from the old table (they are all different)
+    for d in self.table:
+      if d == 0: continue
+      k = d & mask
+      while t[k]: k = (k + 1) & mask
+      t[k] = d
+    self.close()
+    if path is not None:
+      import os
+      # the new file replaces the old one (it is closed first, for Windows)
+      t.release()
+      m.close()
+      f.close()
+      os.replace(path, self.path)
+      (f, m, t) = self._map(open(self.path, 'r+b'), size)
+    (self.file, self.mmap, self.table, self.mask) = (f, m, t, mask)
+
+# make the set used to remove duplicate packings
+# dedup = None or "exact" (a set), "digest" (a DigestSet), or a set-like object
+def _dedup(dedup):
+  if dedup is None or dedup == "exact": return set()
+  if dedup == "digest": return DigestSet()
+  return dedup
+
 # generate symmetrically different packings
-# this keeps track of all packings found, so may use a lot of memory
-def pack_uniq(n, m, rs, packer=pack_tight, order=by_area, verbose=0):
-  return uniq((canonical(n, m, s) for s in pack(n, m, rs, packer, order)), verbose=verbose)
+#
+# with sym=0 all packings are generated, and the canonical forms are
+# used to remove duplicates. this keeps track of all packings found, so
+# may use a lot of memory.
+#
+# <dedup> specifies how the packings found are remembered: None or
+# "exact" uses a set of the canonical forms, "digest" uses a DigestSet
+# (which needs 8 - 16 bytes per packing), or a set-like object (with
+# add() and len()) can be given (e.g. a DigestSet with a <path>).
+#
+# with sym=1 symmetry is broken during the search (the packer must
+# support the <accept> parameter): a rectangle with a shape that occurs
+# only once is chosen, and it is only placed in positions that are
+# minimal under the symmetries of the grid. only packings where this
+# rectangle is placed symmetrically need to be remembered.
+#
+# this requires the packings generated by the packer to be closed under
+# the symmetries of the grid, which is the case for the loose packers,
+# and for the tight packers when the rectangles fill the grid exactly.
+# otherwise (or if there is no suitable rectangle) all packings are
+# generated and remembered.
+def pack_uniq(n, m, rs, packer=pack_tight, order=by_area, verbose=0, sym=0, dedup=None):
+  if not callable(packer): packer = globals().get(packer)
+  if sym and (packer in _loose or sum(w * h for (w, h) in rs) == n * m):
+    # find the largest shape that occurs exactly once
+    ks = list(map(normalise, rs))
+    ks = list(k for k in ks if ks.count(k) == 1)
+    if ks:
+      return _pack_uniq_sym(n, m, rs, packer, order, max(ks, key=unpack(lambda w, h: (w * h, w))), dedup)
+  if dedup is None:
+    return uniq((canonical(n, m, s) for s in pack(n, m, rs, packer, order)), verbose=verbose)
+  return _pack_uniq_dedup(n, m, rs, packer, order, _dedup(dedup))
+
+def _pack_uniq_dedup(n, m, rs, packer, order, seen):
+  for s in pack(n, m, rs, packer, order):
+    s = canonical(n, m, s)
+    k = len(seen)
+    seen.add(s)
+    if len(seen) > k: yield s
+
+# break symmetry using the position of the rectangle with shape <r>
+def _pack_uniq_sym(n, m, rs, packer, order, r, dedup=None):
+  fs = symmetries(n, m)[1:]
+  # only accept minimal positions for the chosen rectangle
+  def accept(p):
+    return normalise(p[2:]) != r or all(p <= f(*p) for f in fs)
+  seen = _dedup(dedup)
+  for s in pack(n, m, rs, packer, order, accept=accept):
+    p = peek(p for p in s if normalise(p[2:]) == r)
+    s = canonical(n, m, s)
+    # if the rectangle is fixed by a symmetry we may see the packing again
+    if any(f(*p) == p for f in fs):
+      k = len(seen)
+      seen.add(s)
+      if len(seen) == k: continue
+    yield s
 
 # return an <n> x <m> grid containg rectangles <ps> = [(x, y, w, h) ...]
-def make_grid(n, m, ps):
+#
+# with backend="numpy" the grid is returned as an <m> x <n> numpy array
+# (if numpy is available, otherwise a list of lists is returned)
+def make_grid(n, m, ps, backend=None):
+  if backend == "numpy":
+    np = arrays.numpy()
+    if np:
+      g = np.zeros((m, n), dtype=np.min_scalar_type(len(ps)))
+      for (k, (x, y, p, q)) in enumerate(ps, start=1):
+        g[y : y + q, x : x + p] = k
+      return g
   # make an empty grid
   g = list([0] * n for _ in irange(1, m))
   # fill out the rectangles
@@ -212,13 +1098,136 @@ def make_grid(n, m, ps):
       g[j][x : x + p] = [k] * p
   return g
 
+# the lines of output for a grid <g> made by make_grid(), with labels up
+# to <k> (the labels are looked up in a table of formatted integers)
+def _grid_lines(g, k):
+  # labels for the rectangles
+  z = len(str(k))
+  ls = list(str(x).zfill(z) for x in irange(0, k))
+  if hasattr(g, 'tolist'): g = g.tolist()
+  return list("[ " + ' '.join(map(ls.__getitem__, r)) + " ]" for r in g)
+
 # output a packed <n> x <m> grid (either from <ps> or <g>)
 def output_grid(n, m, ps=None, g=None, start=None, end=None):
-  if g is None: g = make_grid(n, m, ps)
+  if g is None:
+    ls = _grid_lines(make_grid(n, m, ps), len(ps))
+  else:
+    # the labels of a given grid can be anything
+    if hasattr(g, 'tolist'): g = g.tolist()
+    z = len(str(max(max(r) for r in g)))
+    ls = list("[ " + join((str(x or 0).zfill(z) for x in r), sep=' ') + " ]" for r in g)
   # output the packing
-  k = max(max(r) for r in g)
-  z = len(str(k))
   if start is not None: printf("{start}")
-  for r in g:
-    printf("[ {r} ]", r=join((str(x or 0).zfill(z) for x in r), sep=' '))
+  for r in ls:
+    printf("{r}")
   if end is not None: printf("{end}")
+
+# write packed <n> x <m> grids for each of the packings <pss> to <file>
+# (a file object, or a path to write to)
+#
+# each grid is preceded by <start> and followed by <end> (if not None),
+# output is buffered and written in blocks of (about) <size> bytes
+#
+# returns the number of grids written
+def write_grids(n, m, pss, file, start=None, end="", backend=None, size=1 << 20):
+  if isinstance(file, basestring):
+    with open(file, "w") as f:
+      return write_grids(n, m, pss, f, start=start, end=end, backend=backend, size=size)
+  (buf, t, k) = (list(), 0, 0)
+  for ps in pss:
+    ls = _grid_lines(make_grid(n, m, ps, backend=backend), len(ps))
+    if start is not None: ls.insert(0, start)
+    if end is not None: ls.append(end)
+    ls.append('')
+    s = join(ls, sep="\n")
+    buf.append(s)
+    t += len(s)
+    k += 1
+    if t > size:
+      file.write(join(buf))
+      (buf, t) = (list(), 0)
+  if buf: file.write(join(buf))
+  return k
+
+if __name__ == "__main__":
+
+  from enigma import (arg, args)
+
+  # benchmark packers on the same problem
+  # each packer is run over the first <N> packings, recording the time
+  # taken, the memory (and number of blocks) held by the suspended search
+  # (allocated in this module) after the last packing, and the peak
+  # memory allocated (the packings are not retained)
+  def benchmark(n, m, rs, packers, N=None):
+    from itertools import islice
+    from timeit import default_timer as timer
+    import tracemalloc
+    fs = [tracemalloc.Filter(True, __file__)]
+    printf("[{n}x{m} grid; {k} rectangles]", k=len(rs))
+    for packer in packers:
+      # time the packer
+      t0 = timer()
+      k = sum(1 for _ in islice(pack(n, m, rs, packer=packer), N))
+      t1 = timer()
+      # and run it again to measure the memory used
+      tracemalloc.start()
+      s0 = tracemalloc.take_snapshot().filter_traces(fs)
+      ss = pack(n, m, rs, packer=packer)
+      for _ in islice(ss, N): pass
+      s1 = tracemalloc.take_snapshot().filter_traces(fs)
+      (_, peak) = tracemalloc.get_traced_memory()
+      tracemalloc.stop()
+      ds = s1.compare_to(s0, 'filename')
+      (size, count) = (sum(d.size_diff for d in ds), sum(d.count_diff for d in ds))
+      del ss
+      printf("  {packer}: {k} packings; {t:.3f}s; held = {size} bytes in {count} blocks; peak = {peak} bytes", t=t1 - t0)
+
+  r = arg("A", 0)
+
+  if r == "A":
+    # compare the copying packers with the in-place packers
+    N = arg(10000, 1, int)
+    (n, m) = (12, 10)
+    rs = [(1, 2)] * 8 + [(2, 2)] * 4 + [(1, 3)] * 4 + [(2, 3)] * 3 + [(1, 4)] * 2
+    printf("[A] copying vs. in-place packers (first {N} packings)\n")
+    benchmark(n, m, rs, ["pack_tight", "pack_tight_bits", "pack_tight_ip"], N)
+    benchmark(n, m, rs, ["mpack_tight", "mpack_tight_bits", "mpack_tight_ip"], N)
+    benchmark(n, m, rs, ["pack_loose", "pack_loose_bits", "pack_loose_ip"], N)
+
+  if r == "S":
+    # compare the tight packers on larger grids, up to 100x100
+    N = arg(100, 1, int)
+    printf("[S] tight packers on larger grids (first {N} packings)\n")
+    for n in (10, 20, 50, 100):
+      # tile the n x n grid with 50 rectangles
+      rs = [(n // 5, n // 10)] * 50
+      benchmark(n, n, rs, ["pack_tight", "pack_tight_bits", "pack_tight_ip", "pack_tight_skyline"], N)
+      benchmark(n, n, rs, ["mpack_tight", "mpack_tight_bits", "mpack_tight_ip", "mpack_tight_skyline"], N)
+
+  if r == "G":
+    # write the first <N> packings of a large grid to a file
+    import os
+    from itertools import islice
+    from tempfile import mkstemp
+    from timeit import default_timer as timer
+    N = arg(1000, 1, int)
+    (n, m) = (60, 50)
+    rs = [(6, 5)] * 100
+    pss = list(islice(pack(n, m, rs, packer=mpack_tight_ip), N))
+    printf("[G] writing {N} packings of a {n}x{m} grid\n", N=len(pss))
+    (fd, path) = mkstemp()
+    os.close(fd)
+    # compare with output_grid() for each packing
+    from contextlib import redirect_stdout
+    t0 = timer()
+    with open(path, "w") as f, redirect_stdout(f):
+      for ps in pss: output_grid(n, m, ps, end="")
+    t1 = timer()
+    printf("  output_grid: {t:.3f}s; {z} bytes", t=t1 - t0, z=os.path.getsize(path))
+    for backend in (None, "numpy"):
+      if backend == "numpy" and not arrays.numpy(): continue
+      t0 = timer()
+      write_grids(n, m, pss, path, backend=backend)
+      t1 = timer()
+      printf("  write_grids(backend={backend!r}): {t:.3f}s; {z} bytes", t=t1 - t0, z=os.path.getsize(path))
+    os.remove(path)